@@ -0,0 +1,36 @@
+"""
+Shared Executors
+Process and thread pools shared by the services (workers start on first use)
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+CPU_WORKERS = os.cpu_count() or 1
+
+# Workers come from a clean server process rather than a fork of this threaded one,
+# which could inherit locks held by other threads at fork time
+CPU_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Blocking I/O and GIL-releasing native work (HTTP clients, model training)
+IO_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="service-io")
+
+_cpu_pool = None
+_cpu_pool_lock = threading.Lock()
+
+def get_cpu_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for CPU-bound pure-Python work (e.g. VADER scoring), created on first use
+
+    Callables and their arguments must be picklable.
+    """
+    global _cpu_pool
+    if _cpu_pool is None:
+        with _cpu_pool_lock:
+            if _cpu_pool is None:
+                _cpu_pool = ProcessPoolExecutor(
+                    max_workers=CPU_WORKERS,
+                    mp_context=multiprocessing.get_context(CPU_START_METHOD)
+                )
+    return _cpu_pool
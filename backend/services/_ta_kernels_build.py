@@ -0,0 +1,19 @@
+"""
+Ahead-of-time build of the technical indicator kernels
+Writes the _ta_kernels extension next to this file; technical_indicators imports it when
+present and JIT-compiles the same kernels otherwise.
+
+Usage: python -m backend.services._ta_kernels_build
+"""
+import os
+from numba.pycc import CC
+from .technical_indicators import JIT_KERNELS
+
+cc = CC('_ta_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+for name, (kernel, signature) in JIT_KERNELS.items():
+    cc.export(name, signature)(kernel.py_func)
+
+if __name__ == "__main__":
+    cc.compile()
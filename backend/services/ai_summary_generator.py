@@ -2,44 +2,119 @@
 AI Summary Generator
 Generates natural language summaries and Buy/Hold/Sell verdicts
 """
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Optional
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+class Latest(NamedTuple):
+    """Latest indicator readings (the 'latest' block of calculate_all_indicators)"""
+    # None when missing: the technical summary reads that as 0, the verdict as 50
+    rsi_current: Optional[float] = None
+    macd_current: float = 0.0
+    macd_signal: float = 0.0
+    price_vs_sma20: float = 0.0
+    price_vs_sma50: float = 0.0
+    
+    @classmethod
+    def from_indicators(cls, indicators: Dict) -> "Latest":
+        latest = indicators.get('latest', {})
+        return cls(**{k: v for k, v in latest.items() if k in cls._fields})
+
+
+class FundamentalSnapshot(NamedTuple):
+    """Fundamental ratios used for summaries and verdicts"""
+    pe_ratio: float = 0.0
+    roe: float = 0.0
+    debt_to_equity: float = 0.0
+    revenue_growth: float = 0.0
+    
+    @classmethod
+    def from_fundamentals(cls, fundamentals: Dict) -> "FundamentalSnapshot":
+        return cls(**{k: v for k, v in fundamentals.items() if k in cls._fields})
+
+
+# Summary sentence templates, bound once at import
+_TPL_RSI_OVERBOUGHT = "RSI at {:.1f} indicates overbought conditions, suggesting potential downward pressure.".format
+_TPL_RSI_OVERSOLD = "RSI at {:.1f} indicates oversold conditions, suggesting potential upward reversal.".format
+_TPL_RSI_NEUTRAL = "RSI at {:.1f} is in neutral territory.".format
+_TPL_ABOVE_SMA20 = "Price is {:.1f}% above 20-day SMA, showing strong upward trend.".format
+_TPL_BELOW_SMA20 = "Price is {:.1f}% below 20-day SMA, indicating weakness.".format
+_TPL_PE_LOW = "P/E ratio of {:.1f} suggests the stock may be undervalued.".format
+_TPL_PE_HIGH = "P/E ratio of {:.1f} indicates premium valuation.".format
+_TPL_PE_FAIR = "P/E ratio of {:.1f} is within reasonable range.".format
+_TPL_ROE_STRONG = "Strong ROE of {:.1f}% indicates efficient use of equity.".format
+_TPL_ROE_MODERATE = "ROE of {:.1f}% is moderate.".format
+_TPL_REVENUE_GROWTH = "Revenue growth of {:.1f}% shows strong business expansion.".format
+_TPL_REVENUE_DECLINE = "Revenue declined by {:.1f}%, which is concerning.".format
+_TPL_HIGH_DEBT = "High debt-to-equity ratio of {:.1f} indicates elevated financial risk.".format
+_TPL_NEWS_POSITIVE = "News sentiment is positive with {} favorable articles.".format
+_TPL_NEWS_NEGATIVE = "News sentiment is negative with {} unfavorable articles.".format
+_TPL_HEADLINE = "Recent headline: '{}...'".format
+
+# RSI band edges: below the first is oversold, above the second overbought
+_RSI_BANDS = (30.0, 70.0)
+_RSI_OVERSOLD, _RSI_OVERBOUGHT = _RSI_BANDS
+_RSI_TEMPLATES = (_TPL_RSI_OVERSOLD, _TPL_RSI_NEUTRAL, _TPL_RSI_OVERBOUGHT)
+
+# Verdict scoring rules: (predicate, score delta, reason), evaluated in order.
+# Technical 40%, Fundamental 30%, Sentiment 15%, Prediction 15%.
+VERDICT_RULES = (
+    # Technical
+    (lambda s: s['rsi'] < _RSI_OVERSOLD, 15, "Oversold RSI suggests buying opportunity"),
+    (lambda s: s['rsi'] > _RSI_OVERBOUGHT, -15, "Overbought RSI suggests caution"),
+    (lambda s: s['macd'] > s['macd_signal'], 10, "Bullish MACD crossover"),
+    (lambda s: not s['macd'] > s['macd_signal'], -10, "Bearish MACD signal"),
+    (lambda s: s['price_vs_sma20'] > 0, 15, "Price above 20-day moving average"),
+    (lambda s: not s['price_vs_sma20'] > 0, -15, "Price below 20-day moving average"),
+    # Fundamental
+    (lambda s: 0 < s['pe_ratio'] < 20, 10, "Attractive valuation"),
+    (lambda s: s['pe_ratio'] > 40, -10, "High valuation concerns"),
+    (lambda s: s['roe'] > 15, 10, "Strong return on equity"),
+    (lambda s: s['revenue_growth'] > 10, 10, "Strong revenue growth"),
+    (lambda s: s['revenue_growth'] < 0, -10, "Declining revenues"),
+    # Sentiment
+    (lambda s: s['sentiment_label'] == 'positive', 15, "Positive news sentiment"),
+    (lambda s: s['sentiment_label'] == 'negative', -15, "Negative news sentiment"),
+    # Prediction
+    (lambda s: s['trend'] == 'upward' and s['change_percent'] > 5, 15, "AI predicts significant upside"),
+    (lambda s: s['trend'] == 'downward' and s['change_percent'] < -5, -15, "AI predicts significant downside"),
+)
+
+# Attached to every verdict, single or batch
+VERDICT_DISCLAIMER = "This is an AI-generated recommendation based on historical data and should not be considered as financial advice. Please conduct your own research and consult with a financial advisor before making investment decisions."
+
 class AISummaryGenerator:
     @staticmethod
     def generate_technical_summary(indicators: Dict, fundamentals: Dict) -> str:
         """Generate summary of technical analysis"""
+        return AISummaryGenerator._technical_summary(Latest.from_indicators(indicators))
+    
+    @staticmethod
+    def _technical_summary(latest: Latest) -> str:
+        """Technical summary from already-parsed indicator readings"""
         try:
-            latest = indicators.get('latest', {})
-            rsi = latest.get('rsi_current', 0)
-            macd = latest.get('macd_current', 0)
-            macd_signal = latest.get('macd_signal', 0)
-            price_vs_sma20 = latest.get('price_vs_sma20', 0)
-            price_vs_sma50 = latest.get('price_vs_sma50', 0)
+            rsi = latest.rsi_current if latest.rsi_current is not None else 0
+            price_vs_sma20 = latest.price_vs_sma20
             
             summary_parts = []
             
-            # RSI Analysis
-            if rsi > 70:
-                summary_parts.append(f"RSI at {rsi:.1f} indicates overbought conditions, suggesting potential downward pressure.")
-            elif rsi < 30:
-                summary_parts.append(f"RSI at {rsi:.1f} indicates oversold conditions, suggesting potential upward reversal.")
-            else:
-                summary_parts.append(f"RSI at {rsi:.1f} is in neutral territory.")
+            # RSI Analysis: band index 0 oversold, 1 neutral, 2 overbought
+            rsi_band = (not rsi < _RSI_OVERSOLD) + (rsi > _RSI_OVERBOUGHT)
+            summary_parts.append(_RSI_TEMPLATES[rsi_band](rsi))
             
             # MACD Analysis
-            if macd > macd_signal:
+            if latest.macd_current > latest.macd_signal:
                 summary_parts.append("MACD shows bullish momentum with the line above signal.")
             else:
                 summary_parts.append("MACD shows bearish momentum with the line below signal.")
             
             # Moving Average Analysis
             if price_vs_sma20 > 5:
-                summary_parts.append(f"Price is {price_vs_sma20:.1f}% above 20-day SMA, showing strong upward trend.")
+                summary_parts.append(_TPL_ABOVE_SMA20(price_vs_sma20))
             elif price_vs_sma20 < -5:
-                summary_parts.append(f"Price is {abs(price_vs_sma20):.1f}% below 20-day SMA, indicating weakness.")
+                summary_parts.append(_TPL_BELOW_SMA20(-price_vs_sma20))
             
             return " ".join(summary_parts)
             
@@ -50,38 +125,43 @@ class AISummaryGenerator:
     @staticmethod
     def generate_fundamental_summary(fundamentals: Dict) -> str:
         """Generate summary of fundamental analysis"""
+        return AISummaryGenerator._fundamental_summary(FundamentalSnapshot.from_fundamentals(fundamentals))
+    
+    @staticmethod
+    def _fundamental_summary(fund: FundamentalSnapshot) -> str:
+        """Fundamental summary from already-parsed ratios"""
         try:
             summary_parts = []
             
-            pe_ratio = fundamentals.get('pe_ratio', 0)
-            roe = fundamentals.get('roe', 0)
-            debt_to_equity = fundamentals.get('debt_to_equity', 0)
-            revenue_growth = fundamentals.get('revenue_growth', 0)
+            pe_ratio = fund.pe_ratio
+            roe = fund.roe
+            debt_to_equity = fund.debt_to_equity
+            revenue_growth = fund.revenue_growth
             
             # P/E Analysis
             if pe_ratio > 0:
                 if pe_ratio < 15:
-                    summary_parts.append(f"P/E ratio of {pe_ratio:.1f} suggests the stock may be undervalued.")
+                    summary_parts.append(_TPL_PE_LOW(pe_ratio))
                 elif pe_ratio > 30:
-                    summary_parts.append(f"P/E ratio of {pe_ratio:.1f} indicates premium valuation.")
+                    summary_parts.append(_TPL_PE_HIGH(pe_ratio))
                 else:
-                    summary_parts.append(f"P/E ratio of {pe_ratio:.1f} is within reasonable range.")
+                    summary_parts.append(_TPL_PE_FAIR(pe_ratio))
             
             # ROE Analysis
             if roe > 15:
-                summary_parts.append(f"Strong ROE of {roe:.1f}% indicates efficient use of equity.")
+                summary_parts.append(_TPL_ROE_STRONG(roe))
             elif roe > 0:
-                summary_parts.append(f"ROE of {roe:.1f}% is moderate.")
+                summary_parts.append(_TPL_ROE_MODERATE(roe))
             
             # Growth Analysis
             if revenue_growth > 15:
-                summary_parts.append(f"Revenue growth of {revenue_growth:.1f}% shows strong business expansion.")
+                summary_parts.append(_TPL_REVENUE_GROWTH(revenue_growth))
             elif revenue_growth < 0:
-                summary_parts.append(f"Revenue declined by {abs(revenue_growth):.1f}%, which is concerning.")
+                summary_parts.append(_TPL_REVENUE_DECLINE(-revenue_growth))
             
             # Debt Analysis
             if debt_to_equity > 2:
-                summary_parts.append(f"High debt-to-equity ratio of {debt_to_equity:.1f} indicates elevated financial risk.")
+                summary_parts.append(_TPL_HIGH_DEBT(debt_to_equity))
             elif debt_to_equity < 0.5:
                 summary_parts.append("Low debt levels indicate strong financial health.")
             
@@ -103,16 +183,16 @@ class AISummaryGenerator:
             summary_parts = []
             
             if label == 'positive':
-                summary_parts.append(f"News sentiment is positive with {positive_count} favorable articles.")
+                summary_parts.append(_TPL_NEWS_POSITIVE(positive_count))
             elif label == 'negative':
-                summary_parts.append(f"News sentiment is negative with {negative_count} unfavorable articles.")
+                summary_parts.append(_TPL_NEWS_NEGATIVE(negative_count))
             else:
                 summary_parts.append("News sentiment is neutral with mixed coverage.")
             
             # Mention key news if available
             if news and len(news) > 0:
                 recent_news = news[0]
-                summary_parts.append(f"Recent headline: '{recent_news.get('title', '')[:100]}...'")
+                summary_parts.append(_TPL_HEADLINE(recent_news.get('title', '')[:100]))
             
             return " ".join(summary_parts)
             
@@ -159,81 +239,37 @@ class AISummaryGenerator:
         Returns:
             Dictionary with verdict and confidence
         """
+        return AISummaryGenerator._verdict(
+            Latest.from_indicators(indicators),
+            FundamentalSnapshot.from_fundamentals(fundamentals),
+            sentiment,
+            prediction
+        )
+    
+    @staticmethod
+    def _verdict(latest: Latest, fund: FundamentalSnapshot, sentiment: Dict, prediction: Dict) -> Dict:
+        """Verdict from already-parsed indicator readings and ratios"""
         try:
+            signals = {
+                'rsi': latest.rsi_current if latest.rsi_current is not None else 50,
+                'macd': latest.macd_current,
+                'macd_signal': latest.macd_signal,
+                'price_vs_sma20': latest.price_vs_sma20,
+                'pe_ratio': fund.pe_ratio,
+                'roe': fund.roe,
+                'revenue_growth': fund.revenue_growth,
+                'sentiment_label': sentiment.get('label', 'neutral'),
+                'trend': prediction.get('trend', 'neutral'),
+                'change_percent': prediction.get('change_percent', 0),
+            }
+            
             # Scoring system
             score = 0
             reasons = []
-            
-            # Technical Score (40%)
-            latest = indicators.get('latest', {})
-            rsi = latest.get('rsi_current', 50)
-            macd = latest.get('macd_current', 0)
-            macd_signal = latest.get('macd_signal', 0)
-            price_vs_sma20 = latest.get('price_vs_sma20', 0)
-            
-            if rsi < 30:
-                score += 15
-                reasons.append("Oversold RSI suggests buying opportunity")
-            elif rsi > 70:
-                score -= 15
-                reasons.append("Overbought RSI suggests caution")
-            
-            if macd > macd_signal:
-                score += 10
-                reasons.append("Bullish MACD crossover")
-            else:
-                score -= 10
-                reasons.append("Bearish MACD signal")
-            
-            if price_vs_sma20 > 0:
-                score += 15
-                reasons.append("Price above 20-day moving average")
-            else:
-                score -= 15
-                reasons.append("Price below 20-day moving average")
-            
-            # Fundamental Score (30%)
-            pe_ratio = fundamentals.get('pe_ratio', 0)
-            roe = fundamentals.get('roe', 0)
-            revenue_growth = fundamentals.get('revenue_growth', 0)
-            
-            if 0 < pe_ratio < 20:
-                score += 10
-                reasons.append("Attractive valuation")
-            elif pe_ratio > 40:
-                score -= 10
-                reasons.append("High valuation concerns")
-            
-            if roe > 15:
-                score += 10
-                reasons.append("Strong return on equity")
-            
-            if revenue_growth > 10:
-                score += 10
-                reasons.append("Strong revenue growth")
-            elif revenue_growth < 0:
-                score -= 10
-                reasons.append("Declining revenues")
-            
-            # Sentiment Score (15%)
-            sentiment_label = sentiment.get('label', 'neutral')
-            if sentiment_label == 'positive':
-                score += 15
-                reasons.append("Positive news sentiment")
-            elif sentiment_label == 'negative':
-                score -= 15
-                reasons.append("Negative news sentiment")
-            
-            # Prediction Score (15%)
-            trend = prediction.get('trend', 'neutral')
-            change_percent = prediction.get('change_percent', 0)
-            
-            if trend == 'upward' and change_percent > 5:
-                score += 15
-                reasons.append("AI predicts significant upside")
-            elif trend == 'downward' and change_percent < -5:
-                score -= 15
-                reasons.append("AI predicts significant downside")
+            for predicate, delta, reason in VERDICT_RULES:
+                if predicate(signals):
+                    score += delta
+                    reasons.append(reason)
             
             # Determine verdict
             if score >= 40:
@@ -251,7 +287,7 @@ class AISummaryGenerator:
                 "confidence": round(confidence, 1),
                 "score": score,
                 "reasons": reasons[:5],  # Top 5 reasons
-                "disclaimer": "This is an AI-generated recommendation based on historical data and should not be considered as financial advice. Please conduct your own research and consult with a financial advisor before making investment decisions."
+                "disclaimer": VERDICT_DISCLAIMER
             }
             
         except Exception as e:
@@ -264,6 +300,96 @@ class AISummaryGenerator:
                 "disclaimer": "Analysis unavailable. Please consult a financial advisor."
             }
     
+    @staticmethod
+    def generate_verdicts_batch(
+        fundamentals,
+        indicators,
+        sentiment,
+        prediction,
+        top_k: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Score many stocks at once from columnar inputs
+        
+        Args:
+            fundamentals: Columns pe_ratio, roe, revenue_growth (DataFrame or dict of arrays)
+            indicators: Columns rsi_current, macd_current, macd_signal, price_vs_sma20
+            sentiment: Column label
+            prediction: Columns trend, change_percent
+            top_k: Only return the top_k highest-scoring rows (all rows if None)
+            
+        Returns:
+            List of verdict dictionaries ordered by score, each with its row index
+        """
+        try:
+            rsi = np.asarray(indicators['rsi_current'], dtype=np.float64)
+            macd = np.asarray(indicators['macd_current'], dtype=np.float64)
+            macd_signal = np.asarray(indicators['macd_signal'], dtype=np.float64)
+            price_vs_sma20 = np.asarray(indicators['price_vs_sma20'], dtype=np.float64)
+            pe_ratio = np.asarray(fundamentals['pe_ratio'], dtype=np.float64)
+            roe = np.asarray(fundamentals['roe'], dtype=np.float64)
+            revenue_growth = np.asarray(fundamentals['revenue_growth'], dtype=np.float64)
+            sentiment_label = np.asarray(sentiment['label'])
+            trend = np.asarray(prediction['trend'])
+            change_percent = np.asarray(prediction['change_percent'], dtype=np.float64)
+            
+            # Same weights as VERDICT_RULES, evaluated column-wise
+            score = (
+                np.where(rsi < _RSI_OVERSOLD, 15, 0) + np.where(rsi > _RSI_OVERBOUGHT, -15, 0)
+                + np.where(macd > macd_signal, 10, -10)
+                + np.where(price_vs_sma20 > 0, 15, -15)
+                + np.where((pe_ratio > 0) & (pe_ratio < 20), 10, 0) + np.where(pe_ratio > 40, -10, 0)
+                + np.where(roe > 15, 10, 0)
+                + np.where(revenue_growth > 10, 10, 0) + np.where(revenue_growth < 0, -10, 0)
+                + np.where(sentiment_label == 'positive', 15, 0) + np.where(sentiment_label == 'negative', -15, 0)
+                + np.where((trend == 'upward') & (change_percent > 5), 15, 0)
+                + np.where((trend == 'downward') & (change_percent < -5), -15, 0)
+            )
+            
+            buy = score >= 40
+            sell = score <= -40
+            verdicts = np.select([buy, sell], ["BUY", "SELL"], default="HOLD")
+            confidence = np.select(
+                [buy, sell],
+                [np.minimum(70 + (score - 40), 95), np.minimum(70 + np.abs(score + 40), 95)],
+                default=60 + np.abs(score) / 2
+            )
+            
+            order = np.argsort(-score, kind='stable')
+            if top_k is not None:
+                order = order[:top_k]
+            
+            # Reasons are only assembled for the rows being returned
+            results = []
+            for i in order.tolist():
+                signals = {
+                    'rsi': rsi[i],
+                    'macd': macd[i],
+                    'macd_signal': macd_signal[i],
+                    'price_vs_sma20': price_vs_sma20[i],
+                    'pe_ratio': pe_ratio[i],
+                    'roe': roe[i],
+                    'revenue_growth': revenue_growth[i],
+                    'sentiment_label': sentiment_label[i],
+                    'trend': trend[i],
+                    'change_percent': change_percent[i],
+                }
+                reasons = [reason for predicate, _, reason in VERDICT_RULES if predicate(signals)]
+                results.append({
+                    "index": i,
+                    "verdict": str(verdicts[i]),
+                    "confidence": round(float(confidence[i]), 1),
+                    "score": int(score[i]),
+                    "reasons": reasons[:5],
+                    "disclaimer": VERDICT_DISCLAIMER
+                })
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error generating batch verdicts: {str(e)}")
+            return []
+    
     @staticmethod
     def generate_complete_summary(
         fundamentals: Dict,
@@ -274,11 +400,15 @@ class AISummaryGenerator:
     ) -> Dict:
         """Generate complete AI summary with all components"""
         
-        technical_summary = AISummaryGenerator.generate_technical_summary(indicators, fundamentals)
-        fundamental_summary = AISummaryGenerator.generate_fundamental_summary(fundamentals)
+        # Parse shared inputs once for all components
+        latest = Latest.from_indicators(indicators)
+        fund = FundamentalSnapshot.from_fundamentals(fundamentals)
+        
+        technical_summary = AISummaryGenerator._technical_summary(latest)
+        fundamental_summary = AISummaryGenerator._fundamental_summary(fund)
         sentiment_summary = AISummaryGenerator.generate_sentiment_summary(sentiment, news)
         prediction_summary = AISummaryGenerator.generate_prediction_summary(prediction)
-        verdict = AISummaryGenerator.generate_verdict(fundamentals, indicators, sentiment, prediction)
+        verdict = AISummaryGenerator._verdict(latest, fund, sentiment, prediction)
         
         return {
             "technical_summary": technical_summary,
@@ -289,12 +419,9 @@ class AISummaryGenerator:
         }
 
 
-# Singleton instance
-_generator = None
+# Singleton instance (stateless, so it is safe to build at import)
+_generator = AISummaryGenerator()
 
 def get_summary_generator() -> AISummaryGenerator:
-    """Get or create summary generator instance"""
-    global _generator
-    if _generator is None:
-        _generator = AISummaryGenerator()
+    """Get summary generator instance"""
     return _generator
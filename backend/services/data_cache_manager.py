@@ -3,41 +3,176 @@ Data Cache Manager
 SQLite-based caching with TTL management
 """
 import sqlite3
-import json
 import time
-from typing import Optional, Any, Dict
+import threading
+from collections import OrderedDict
+from typing import Optional, Any, Dict, List, Tuple
 from datetime import datetime, timedelta
 import os
+from collections.abc import Mapping
+import orjson
+
+try:
+    import zstandard
+except ImportError:  # compression is optional
+    zstandard = None
+
+# Max number of decoded values kept in the in-process LRU
+MEMORY_CACHE_SIZE = 1024
+
+# Background sweep of expired rows: interval in seconds and rows per batch
+GC_INTERVAL = 60
+GC_BATCH_SIZE = 1000
+
+# Reclaim free pages once this many rows have been deleted
+VACUUM_THRESHOLD = 10000
+VACUUM_PAGES = 1000
+
+# Payloads larger than this (in practice, historical series) are zstd-compressed
+# before hitting disk; smaller ones like fundamentals don't shrink enough to pay
+COMPRESS_THRESHOLD = 4096
+COMPRESS_LEVEL = 3
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson fallback for read-only mappings (e.g. MappingProxyType)"""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError
+
+
+def _serialize(value: Any) -> bytes:
+    """Encode a cache value as JSON bytes, compressing large payloads"""
+    payload = orjson.dumps(value, default=_json_default, option=_ORJSON_OPTIONS)
+    if zstandard is not None and len(payload) > COMPRESS_THRESHOLD:
+        payload = zstandard.compress(payload, COMPRESS_LEVEL)
+    return payload
+
+
+def _decompress(payload):
+    """JSON text of a stored cache value (inflating zstd-compressed payloads)"""
+    if isinstance(payload, bytes) and payload[:4] == _ZSTD_MAGIC:
+        payload = zstandard.decompress(payload)
+    return payload
+
+
+def _deserialize(payload) -> Any:
+    """Decode a cache value written by _serialize (or a legacy TEXT row)"""
+    return orjson.loads(_decompress(payload))
+
+
+# SQL statements, kept as constants so sqlite3's per-connection statement
+# cache reuses the compiled form on every call
+_CREATE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        category TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        expires_at INTEGER NOT NULL
+    )
+'''
+_CREATE_EXPIRES_INDEX_SQL = 'CREATE INDEX IF NOT EXISTS idx_expires_at ON cache(expires_at)'
+_CREATE_CATEGORY_INDEX_SQL = 'CREATE INDEX IF NOT EXISTS idx_cat_exp ON cache(category, expires_at)'
+_INSERT_SQL = '''
+    INSERT OR REPLACE INTO cache (key, value, category, created_at, expires_at)
+    VALUES (?, ?, ?, ?, ?)
+'''
+_GET_SQL = 'SELECT value, expires_at FROM cache WHERE key = ?'
+_DELETE_SQL = 'DELETE FROM cache WHERE key = ?'
+_DELETE_EXPIRED_SQL = 'DELETE FROM cache WHERE expires_at < ?'
+_DELETE_EXPIRED_BATCH_SQL = '''
+    DELETE FROM cache WHERE rowid IN (
+        SELECT rowid FROM cache WHERE expires_at < ? LIMIT ?
+    )
+'''
+_CLEAR_CATEGORY_SQL = 'DELETE FROM cache WHERE category = ?'
+_STATS_SQL = '''
+    SELECT category, SUM(expires_at >= ?) AS valid, COUNT(*) AS total
+    FROM cache INDEXED BY idx_cat_exp
+    GROUP BY category
+'''
+
 
 class DataCacheManager:
-    def __init__(self, db_path: str = "data/cache.db"):
+    def __init__(
+        self,
+        db_path: str = "data/cache.db",
+        memory_size: int = MEMORY_CACHE_SIZE,
+        gc_interval: int = GC_INTERVAL
+    ):
         self.db_path = db_path
+        
+        # Hot keys are served from memory: key -> (monotonic deadline, JSON payload).
+        # Payloads are decoded on every hit so callers never share a mutable value.
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()
+        self._mem_size = memory_size
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        
+        # One long-lived connection shared by all threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        # Page layout has to be set before the first table is created
+        self._conn.execute('PRAGMA page_size=4096')
+        self._conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute('PRAGMA mmap_size=268435456')
+        
+        self._deleted_since_vacuum = 0
         self._init_db()
+        
+        # Expired rows are swept in the background so reads stay pure SELECTs
+        self._gc_interval = gc_interval
+        if gc_interval:
+            threading.Thread(target=self._gc_loop, name="cache-gc", daemon=True).start()
+    
+    def _gc_loop(self):
+        """Periodically delete expired rows in small batches"""
+        while True:
+            time.sleep(self._gc_interval)
+            try:
+                while self._delete_expired_batch(GC_BATCH_SIZE) == GC_BATCH_SIZE:
+                    pass
+                with self._lock:
+                    self._maybe_vacuum()
+            except sqlite3.Error:
+                # Never let the sweeper die; try again next interval
+                pass
+    
+    def _delete_expired_batch(self, batch_size: int) -> int:
+        """Delete up to batch_size expired rows, returning how many were removed"""
+        now = int(time.time())
+        with self._lock:
+            cursor = self._conn.execute(_DELETE_EXPIRED_BATCH_SQL, (now, batch_size))
+            self._deleted_since_vacuum += cursor.rowcount
+            return cursor.rowcount
+    
+    def _maybe_vacuum(self):
+        """Return free pages to the OS after heavy churn (caller holds the lock)"""
+        if self._deleted_since_vacuum > VACUUM_THRESHOLD:
+            self._conn.execute(f'PRAGMA incremental_vacuum({VACUUM_PAGES})')
+            self._deleted_since_vacuum = 0
     
     def _init_db(self):
         """Initialize SQLite database with cache tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create cache table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cache (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL,
-                category TEXT NOT NULL,
-                created_at INTEGER NOT NULL,
-                expires_at INTEGER NOT NULL
-            )
-        ''')
-        
-        # Create index on expiration
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_expires_at ON cache(expires_at)
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            # Create cache table
+            self._conn.execute(_CREATE_TABLE_SQL)
+            
+            # Create index on expiration
+            self._conn.execute(_CREATE_EXPIRES_INDEX_SQL)
+            
+            # Covering index for per-category stats and clears
+            self._conn.execute(_CREATE_CATEGORY_INDEX_SQL)
+            
+            # Databases created before auto_vacuum was enabled need a one-off rebuild
+            if self._conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                self._conn.execute('VACUUM')
     
     def set(self, key: str, value: Any, category: str = "general", ttl: int = 3600):
         """
@@ -45,23 +180,43 @@ class DataCacheManager:
         
         Args:
             key: Cache key
-            value: Value to cache (will be JSON serialized)
+            value: Value to cache (JSON serialized, compressed when large)
             category: Cache category (fundamentals, news, etc.)
             ttl: Time to live in seconds
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         now = int(time.time())
         expires_at = now + ttl
+        payload = _serialize(value)
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO cache (key, value, category, created_at, expires_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (key, json.dumps(value), category, now, expires_at))
+        with self._lock:
+            self._mem.pop(key, None)
+            self._conn.execute(_INSERT_SQL, (key, payload, category, now, expires_at))
+    
+    def set_many(self, items: List[Tuple[str, Any, str, int]]):
+        """
+        Store several values in one transaction
+        
+        Args:
+            items: List of (key, value, category, ttl) tuples
+        """
+        now = int(time.time())
+        rows = [
+            (key, _serialize(value), category, now, now + ttl)
+            for key, value, category, ttl in items
+        ]
         
-        conn.commit()
-        conn.close()
+        with self._lock:
+            for row in rows:
+                self._mem.pop(row[0], None)
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany(_INSERT_SQL, rows)
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+            # Refresh planner statistics after a bulk load (no-op when nothing changed much)
+            self._conn.execute('PRAGMA optimize')
     
     def get(self, key: str) -> Optional[Any]:
         """
@@ -73,89 +228,70 @@ class DataCacheManager:
         Returns:
             Cached value or None if not found/expired
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._mem.move_to_end(key)
+                payload = entry[1]
+            else:
+                # Read and refill under one lock hold, so a concurrent set()/delete()
+                # can't land in between and have its value shadowed by this stale one
+                row = self._conn.execute(_GET_SQL, (key,)).fetchone()
+                
+                # Expired rows are left for the background sweeper
+                now = time.time()
+                if row is None or row['expires_at'] < int(now):
+                    self._mem.pop(key, None)
+                    return None
+                
+                payload = _decompress(row['value'])
+                self._mem[key] = (time.monotonic() + (row['expires_at'] - now), payload)
+                self._mem.move_to_end(key)
+                if len(self._mem) > self._mem_size:
+                    self._mem.popitem(last=False)
         
-        now = int(time.time())
-        
-        cursor.execute('''
-            SELECT value, expires_at FROM cache WHERE key = ?
-        ''', (key,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result is None:
-            return None
-        
-        value, expires_at = result
-        
-        # Check if expired
-        if expires_at < now:
-            self.delete(key)
-            return None
-        
-        return json.loads(value)
+        # Decoded outside the lock; every hit gets its own copy
+        return orjson.loads(payload)
     
     def delete(self, key: str):
         """Delete cache entry"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM cache WHERE key = ?', (key,))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._mem.pop(key, None)
+            self._conn.execute(_DELETE_SQL, (key,))
     
     def clear_expired(self):
         """Remove all expired cache entries"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         now = int(time.time())
-        cursor.execute('DELETE FROM cache WHERE expires_at < ?', (now,))
         
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.execute(_DELETE_EXPIRED_SQL, (now,))
+            deleted = cursor.rowcount
+            self._deleted_since_vacuum += deleted
+            self._maybe_vacuum()
         
         return deleted
     
     def clear_category(self, category: str):
         """Clear all cache entries in a category"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM cache WHERE category = ?', (category,))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._mem.clear()
+            self._conn.execute(_CLEAR_CATEGORY_SQL, (category,))
     
     def get_stats(self) -> Dict:
         """Get cache statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         now = int(time.time())
         
-        # Total entries
-        cursor.execute('SELECT COUNT(*) FROM cache')
-        total = cursor.fetchone()[0]
+        # Single pass: total and valid counts per category
+        with self._lock:
+            rows = self._conn.execute(_STATS_SQL, (now,)).fetchall()
         
-        # Valid entries
-        cursor.execute('SELECT COUNT(*) FROM cache WHERE expires_at >= ?', (now,))
-        valid = cursor.fetchone()[0]
+        total = sum(row['total'] for row in rows)
+        valid = sum(row['valid'] for row in rows)
+        by_category = {row['category']: row['valid'] for row in rows if row['valid']}
         
         # Expired entries
         expired = total - valid
         
-        # By category
-        cursor.execute('''
-            SELECT category, COUNT(*) 
-            FROM cache 
-            WHERE expires_at >= ?
-            GROUP BY category
-        ''', (now,))
-        by_category = dict(cursor.fetchall())
-        
-        conn.close()
-        
         return {
             "total": total,
             "valid": valid,
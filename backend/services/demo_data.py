@@ -3,11 +3,80 @@ Demo Data for Stock Predictor
 Used when yfinance is rate-limited or markets are closed
 """
 import random
+import sys
+import zlib
+from functools import lru_cache
+from dataclasses import dataclass, fields
+from types import MappingProxyType
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+@dataclass(frozen=True, slots=True)
+class DemoStock:
+    """Compact, immutable demo fundamentals record"""
+    symbol: str
+    name: str
+    sector: str
+    industry: str
+    cmp: float
+    previous_close: float
+    open: float
+    day_high: float
+    day_low: float
+    volume: int
+    market_cap: int
+    pe_ratio: float
+    forward_pe: float
+    peg_ratio: float
+    price_to_book: float
+    dividend_yield: float
+    eps: float
+    beta: float
+    week52_high: float
+    week52_low: float
+    day50_avg: float
+    day200_avg: float
+    profit_margin: float
+    operating_margin: float
+    roe: float
+    roa: float
+    debt_to_equity: float
+    current_ratio: float
+    revenue: int
+    revenue_growth: float
+    earnings_growth: float
+    recommendation: str
+    target_price: float
+    change: float
+    change_percent: float
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "DemoStock":
+        return cls(**{_KEY_TO_FIELD.get(k, k): v for k, v in data.items()})
+    
+    def to_dict(self) -> dict:
+        """Fundamentals dict in the API's key format"""
+        return {key: getattr(self, name) for name, key in _DEMO_FIELD_KEYS}
+
+
+# API keys that aren't valid attribute names
+_KEY_TO_FIELD = {
+    "52_week_high": "week52_high",
+    "52_week_low": "week52_low",
+    "50_day_avg": "day50_avg",
+    "200_day_avg": "day200_avg",
+}
+_FIELD_TO_KEY = {v: k for k, v in _KEY_TO_FIELD.items()}
+_DEMO_FIELD_KEYS = tuple((f.name, _FIELD_TO_KEY.get(f.name, f.name)) for f in fields(DemoStock))
 
 # Keep some hardcoded ones for consistency in demos
-DEMO_STOCKS = {
+_RAW_DEMO_STOCKS = {
     "RELIANCE.NS": {
         "symbol": "RELIANCE.NS",
         "name": "Reliance Industries Limited",
@@ -121,137 +190,222 @@ DEMO_STOCKS = {
     }
 }
 
+# Read-only view with interned symbol keys; built once at import
+DEMO_STOCKS = MappingProxyType({sys.intern(k): DemoStock.from_dict(v) for k, v in _RAW_DEMO_STOCKS.items()})
+_DEMO_SYMBOLS = tuple(DEMO_STOCKS.keys())
+
+# API-shaped fundamentals per demo symbol, built once and shared read-only
+_DEMO_FUNDAMENTALS = MappingProxyType({
+    symbol: MappingProxyType(stock.to_dict()) for symbol, stock in DEMO_STOCKS.items()
+})
+
+def _demo_column(name, dtype):
+    column = np.array([getattr(stock, name) for stock in DEMO_STOCKS.values()], dtype=dtype)
+    column.flags.writeable = False
+    return column
+
+# Column-oriented (one contiguous array per numeric field, keyed by API key) copy of
+# the demo fundamentals for bulk scans; row i is DEMO_STOCKS symbol _DEMO_SYMBOLS[i]
+DEMO_COLUMNS = MappingProxyType({
+    key: _demo_column(name, np.int64 if f.type is int else np.float64)
+    for f, (name, key) in zip(fields(DemoStock), _DEMO_FIELD_KEYS)
+    if f.type in (int, float)
+})
+DEMO_SYMBOL_INDEX = MappingProxyType({symbol: i for i, symbol in enumerate(_DEMO_SYMBOLS)})
+_DEMO_SYMBOL_ARRAY = np.array(_DEMO_SYMBOLS, dtype=object)
+
+def screen(mask_fn):
+    """
+    Screen the demo stocks with a vectorized condition
+    
+    Args:
+        mask_fn: Callable taking DEMO_COLUMNS and returning a boolean array,
+                 e.g. lambda c: (c["pe_ratio"] < 20) & (c["roe"] > 15)
+        
+    Returns:
+        Tuple of matching symbols
+    """
+    return tuple(_DEMO_SYMBOL_ARRAY[mask_fn(DEMO_COLUMNS)])
+
+@lru_cache(maxsize=4096)
+def _symbol_seed(symbol: str) -> int:
+    """Stable per-symbol RNG seed (CRC32, so anagrams like ABC/BAC don't collide)"""
+    return zlib.crc32(symbol.encode())
+
+@lru_cache(maxsize=2048)
 def generate_dynamic_fundamental(symbol: str):
-    """Generate consistent random fundamental data for a symbol"""
+    """Generate consistent random fundamental data for a symbol (memoized, read-only)"""
     # Seed based on symbol string to ensure same symbol gets same values
-    seed_val = sum(ord(c) for c in symbol)
-    random.seed(seed_val)
+    seed_val = _symbol_seed(symbol)
+    rng = random.Random(seed_val)
     
     # Base price between 100 and 5000
-    base_price = random.uniform(100, 5000)
-    change = random.uniform(-base_price*0.05, base_price*0.05)
+    base_price = rng.uniform(100, 5000)
+    change = rng.uniform(-base_price*0.05, base_price*0.05)
     
-    return {
+    return MappingProxyType({
         "symbol": symbol,
         "name": f"{symbol.split('.')[0]} Limited",
-        "sector": random.choice(["Technology", "Finance", "Energy", "Healthcare", "Consumer Goods"]),
+        "sector": rng.choice(["Technology", "Finance", "Energy", "Healthcare", "Consumer Goods"]),
         "industry": "Diversified",
         "cmp": round(base_price, 2),
         "previous_close": round(base_price - change, 2),
         "open": round(base_price - change * 0.5, 2),
         "day_high": round(base_price * 1.02, 2),
         "day_low": round(base_price * 0.98, 2),
-        "volume": random.randint(10000, 5000000),
-        "market_cap": random.randint(1000, 50000) * 10000000,  # 1000-50000 Cr
-        "pe_ratio": round(random.uniform(10, 80), 2),
-        "forward_pe": round(random.uniform(10, 80) * 0.9, 2),
-        "peg_ratio": round(random.uniform(0.5, 3.0), 2),
-        "price_to_book": round(random.uniform(1, 15), 2),
-        "dividend_yield": round(random.uniform(0, 5), 2),
-        "eps": round(base_price / random.uniform(15, 30), 2),
-        "beta": round(random.uniform(0.5, 1.8), 2),
+        "volume": rng.randint(10000, 5000000),
+        "market_cap": rng.randint(1000, 50000) * 10000000,  # 1000-50000 Cr
+        "pe_ratio": round(rng.uniform(10, 80), 2),
+        "forward_pe": round(rng.uniform(10, 80) * 0.9, 2),
+        "peg_ratio": round(rng.uniform(0.5, 3.0), 2),
+        "price_to_book": round(rng.uniform(1, 15), 2),
+        "dividend_yield": round(rng.uniform(0, 5), 2),
+        "eps": round(base_price / rng.uniform(15, 30), 2),
+        "beta": round(rng.uniform(0.5, 1.8), 2),
         "52_week_high": round(base_price * 1.2, 2),
         "52_week_low": round(base_price * 0.8, 2),
         "50_day_avg": round(base_price * 0.95, 2),
         "200_day_avg": round(base_price * 0.9, 2),
-        "profit_margin": round(random.uniform(5, 30), 2),
-        "operating_margin": round(random.uniform(10, 40), 2),
-        "roe": round(random.uniform(10, 30), 2),
-        "roa": round(random.uniform(5, 15), 2),
-        "debt_to_equity": round(random.uniform(0, 2), 2),
-        "current_ratio": round(random.uniform(1, 4), 2),
-        "revenue": random.randint(5000, 100000) * 10000000,
-        "revenue_growth": round(random.uniform(0, 25), 1),
-        "earnings_growth": round(random.uniform(0, 30), 1),
-        "recommendation": random.choice(["buy", "hold", "sell"]),
+        "profit_margin": round(rng.uniform(5, 30), 2),
+        "operating_margin": round(rng.uniform(10, 40), 2),
+        "roe": round(rng.uniform(10, 30), 2),
+        "roa": round(rng.uniform(5, 15), 2),
+        "debt_to_equity": round(rng.uniform(0, 2), 2),
+        "current_ratio": round(rng.uniform(1, 4), 2),
+        "revenue": rng.randint(5000, 100000) * 10000000,
+        "revenue_growth": round(rng.uniform(0, 25), 1),
+        "earnings_growth": round(rng.uniform(0, 30), 1),
+        "recommendation": rng.choice(["buy", "hold", "sell"]),
         "target_price": round(base_price * 1.15, 2),
         "change": round(change, 2),
         "change_percent": round((change / (base_price - change)) * 100, 2)
-    }
+    })
 
-def get_demo_stock(symbol: str):
-    """Get demo stock data"""
-    if symbol in DEMO_STOCKS:
-        return DEMO_STOCKS[symbol]
+def _get_demo_record(symbol: str) -> DemoStock:
+    """Get demo stock as a DemoStock record"""
+    stock = DEMO_STOCKS.get(symbol)
+    if stock is not None:
+        return stock
     
     # Generate dynamic data for unknown symbols
-    return generate_dynamic_fundamental(symbol)
+    return DemoStock.from_dict(generate_dynamic_fundamental(symbol))
+
+def get_demo_stock(symbol: str):
+    """Get demo stock data (read-only mapping for the built-in demo stocks)"""
+    # Generate dynamic data for unknown symbols
+    return _DEMO_FUNDAMENTALS.get(symbol) or generate_dynamic_fundamental(symbol)
 
 def get_all_demo_symbols():
-    """Get list of all demo symbols"""
-    return list(DEMO_STOCKS.keys())
+    """Get all demo symbols (cached tuple)"""
+    return _DEMO_SYMBOLS
 
-def generate_demo_historical_data(symbol: str, days: int = 252):
-    """Generate realistic historical data for demo stocks"""
+def _hist_draws(seed, days):
+    """Random draws behind a demo series (one generator, so the series doesn't depend on Numba)"""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 0.015, days)
+    r1 = rng.uniform(-0.5, 0.5, days)
+    r2 = rng.uniform(0, 0.5, days)
+    rv = rng.random(days)
+    return steps, r1, r2, rv
+
+def _candles_numpy(steps, r1, r2, rv, base_price, base_volume):
+    """Random-walk OHLCV series ending at base_price from its draws (pure NumPy)"""
+    days = steps.size
+    
+    # Random walk with 1.5% daily volatility, rescaled so the LAST close matches base_price
+    close = np.empty(days)
+    close[0] = 0
+    np.cumsum(steps[1:], out=close[1:])
+    np.exp(close, out=close)
+    close *= base_price / close[-1]
+    
+    # Randomize relationship within day
+    open_ = close * (1 + r1 * 0.01)
+    high = np.maximum(open_, close) * (1 + r2 * 0.01)
+    low = np.minimum(open_, close) * (1 - r2 * 0.01)
     
+    # Volume with some variation
+    volume = (base_volume * (0.7 + rv * 0.6)).astype(np.int64)
+    
+    return open_, high, low, close, volume
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _candles(steps, r1, r2, rv, base_price, base_volume):
+        """Random-walk OHLCV series ending at base_price from its draws, built in one native pass"""
+        days = steps.size
+        open_ = np.empty(days)
+        high = np.empty(days)
+        low = np.empty(days)
+        close = np.empty(days)
+        volume = np.empty(days, dtype=np.int64)
+        
+        # Random walk with 1.5% daily volatility
+        level = 0.0
+        close[0] = 1.0
+        for i in range(1, days):
+            level += steps[i]
+            close[i] = np.exp(level)
+        
+        # Rescale so the LAST close matches base_price, then build the candles
+        scale = base_price / close[days - 1]
+        for i in range(days):
+            c = close[i] * scale
+            close[i] = c
+            o = c * (1 + r1[i] * 0.01)
+            open_[i] = o
+            high[i] = max(o, c) * (1 + r2[i] * 0.01)
+            low[i] = min(o, c) * (1 - r2[i] * 0.01)
+            volume[i] = int(base_volume * (0.7 + rv[i] * 0.6))
+        
+        return open_, high, low, close, volume
+    
+    # Compile at import so the first request doesn't pay the JIT cost
+    _candles(*_hist_draws(0, 1), 1.0, 1.0)
+else:
+    _candles = _candles_numpy
+
+def _gen_hist(seed, days, base_price, base_volume):
+    """Random-walk OHLCV series ending at base_price, the same for a seed with or without Numba"""
+    return _candles(*_hist_draws(seed, days), base_price, base_volume)
+
+def _read_only(arr: np.ndarray) -> np.ndarray:
+    """Mark an array read-only and return it"""
+    arr.setflags(write=False)
+    return arr
+
+def generate_demo_historical_data(symbol: str, days: int = 252):
+    """Generate realistic historical data for demo stocks (memoized per day, read-only)"""
+    return _generate_demo_history(symbol, days, datetime.now().date())
+
+@lru_cache(maxsize=256)
+def _generate_demo_history(symbol: str, days: int, today):
+    """Build the demo OHLCV series ending on the trading day before `today`"""
     # First get fundamental info to base price on
-    stock_data = get_demo_stock(symbol)
+    stock_data = _get_demo_record(symbol)
     if not stock_data:
         # Should not happen with new dynamic generator
         return None
     
-    # Generate dates (trading days only - Mon-Fri)
-    dates = []
-    current_date = datetime.now()
-    while len(dates) < days:
-        current_date -= timedelta(days=1)
-        # Skip weekends
-        if current_date.weekday() < 5:  # 0-4 is Mon-Fri
-            dates.append(current_date.strftime('%Y-%m-%d'))
-    
-    dates.reverse()  # Oldest to newest
+    # Generate dates (trading days only - Mon-Fri), oldest to newest
+    offsets = -np.arange(days, 0, -1)
+    dates = tuple(np.busday_offset(np.datetime64(today), offsets, roll='forward').astype(str).tolist())
     
     # Generate realistic price data with trend
-    base_price = stock_data['cmp']
-    prices = []
-    
-    # Create a realistic price movement
-    np.random.seed(sum(ord(c) for c in symbol))  # Consistent random data for same symbol
-    
-    # Start price (backwards from current)
-    # We want the LAST price to match base_price roughly
-    
-    # Generate random walk
-    walk = np.random.normal(0, 0.015, days) # 1.5% daily volatility
-    walk[0] = 0
-    cumulative_returns = np.exp(np.cumsum(walk))
-    
-    # Adjust last value to match current price
-    adjustment = base_price / cumulative_returns[-1]
-    prices = cumulative_returns * adjustment
-    
-    prices = prices.tolist()
+    seed = _symbol_seed(symbol)  # Consistent random data for same symbol
+    open_prices, high_prices, low_prices, prices, volumes = _gen_hist(
+        seed, days, float(stock_data.cmp), float(stock_data.volume)
+    )
     
-    # Generate OHLCV data
-    historical_data = {
+    # Memoized and shared by every caller, so the series themselves are immutable too
+    historical_data = MappingProxyType({
         "dates": dates,
-        "open": [],
-        "high": [],
-        "low": [],
-        "close": [],
-        "volume": []
-    }
-    
-    for i, close_price in enumerate(prices):
-        # Generate realistic OHLC
-        daily_range = close_price * 0.02  # 2% daily range
-        
-        # Randomize relationship within day
-        r1 = np.random.uniform(-0.5, 0.5)
-        r2 = np.random.uniform(0, 0.5)
-        
-        open_price = close_price * (1 + r1 * 0.01)
-        high_price = max(open_price, close_price) * (1 + r2 * 0.01)
-        low_price = min(open_price, close_price) * (1 - r2 * 0.01)
-        
-        historical_data["close"].append(round(close_price, 2))
-        historical_data["open"].append(round(open_price, 2))
-        historical_data["high"].append(round(high_price, 2))
-        historical_data["low"].append(round(low_price, 2))
-        
-        # Generate volume (with some variation)
-        base_volume = stock_data['volume']
-        volume = int(base_volume * (0.7 + np.random.random() * 0.6))
-        historical_data["volume"].append(volume)
+        "open": _read_only(np.round(open_prices, 2)),
+        "high": _read_only(np.round(high_prices, 2)),
+        "low": _read_only(np.round(low_prices, 2)),
+        "close": _read_only(np.round(prices, 2)),
+        "volume": _read_only(volumes)
+    })
     
     return historical_data
@@ -2,18 +2,141 @@
 Fundamentals Fetcher Service
 Fetches stock fundamentals using yfinance with caching
 """
-import yfinance as yf
-from typing import Dict, Optional
+import asyncio
+import httpx
+import numpy as np
+import threading
+from collections import defaultdict
+from functools import cached_property
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
 import logging
 from .data_cache_manager import get_cache
 from .demo_data import get_demo_stock, generate_demo_historical_data
+from .ohlcv import OHLCV
 
 logger = logging.getLogger(__name__)
 
+# Concurrent `.info` requests issued by get_fundamentals_batch
+BATCH_WORKERS = 8
+
+# How long (seconds) a failed yfinance lookup suppresses retries for that symbol
+NEGATIVE_CACHE_TTL = 600
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+
+# (output key, yfinance info key, scale) for the numeric fundamentals, in API order.
+# A scale of None passes the value through; otherwise falsy values become 0.
+INFO_FIELDS = (
+    ("previous_close", "previousClose", None),
+    ("open", "open", None),
+    ("day_high", "dayHigh", None),
+    ("day_low", "dayLow", None),
+    ("volume", "volume", None),
+    ("market_cap", "marketCap", None),
+    ("pe_ratio", "trailingPE", None),
+    ("forward_pe", "forwardPE", None),
+    ("peg_ratio", "pegRatio", None),
+    ("price_to_book", "priceToBook", None),
+    ("dividend_yield", "dividendYield", 100),
+    ("eps", "trailingEps", None),
+    ("beta", "beta", None),
+    ("52_week_high", "fiftyTwoWeekHigh", None),
+    ("52_week_low", "fiftyTwoWeekLow", None),
+    ("50_day_avg", "fiftyDayAverage", None),
+    ("200_day_avg", "twoHundredDayAverage", None),
+    ("profit_margin", "profitMargins", 100),
+    ("operating_margin", "operatingMargins", 100),
+    ("roe", "returnOnEquity", 100),
+    ("roa", "returnOnAssets", 100),
+    ("debt_to_equity", "debtToEquity", None),
+    ("current_ratio", "currentRatio", None),
+    ("revenue", "totalRevenue", None),
+    ("revenue_growth", "revenueGrowth", 100),
+    ("earnings_growth", "earningsGrowth", 100),
+)
+
+# One pooled session per thread, reused by every yfinance call on that thread so connections
+# are kept alive. Sessions aren't shared across threads: a curl_cffi session wraps a single
+# curl handle. Recent yfinance only accepts curl_cffi sessions; fall back to requests otherwise.
+try:
+    from curl_cffi import requests as curl_requests
+    
+    def _new_session():
+        return curl_requests.Session(impersonate="chrome")
+except ImportError:
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    def _new_session():
+        session = requests.Session()
+        session.headers.update({'User-Agent': USER_AGENT})
+        session.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=50))
+        return session
+
+_sessions = threading.local()
+
+def _thread_session():
+    """This thread's yfinance session, created on first use"""
+    session = getattr(_sessions, 'session', None)
+    if session is None:
+        session = _sessions.session = _new_session()
+    return session
+
+# key -> (Yahoo ticker, display name, fallback data when the market is closed)
+MARKET_INDICES = {
+    "nifty50": ("^NSEI", "NIFTY 50", {
+        "name": "NIFTY 50",
+        "value": 21731.40,
+        "previous_close": 21697.50,
+        "change": 33.90,
+        "change_percent": 0.16
+    }),
+    "sensex": ("^BSESN", "SENSEX", {
+        "name": "SENSEX",
+        "value": 71752.11,
+        "previous_close": 71657.71,
+        "change": 94.40,
+        "change_percent": 0.13
+    }),
+}
+
 class FundamentalsFetcher:
     def __init__(self, cache_ttl: int = 86400):  # 24 hours default
         self.cache = get_cache()
         self.cache_ttl = cache_ttl
+        # Cache key -> Future of the fetch currently running for it
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+    
+    @cached_property
+    def _yf(self):
+        """yfinance module, imported on first use (it pulls in a heavy dependency tree)"""
+        import yfinance
+        return yfinance
+    
+    def _singleflight(self, key: str, fetch):
+        """Run fetch once for concurrent callers of the same key; the rest wait for its result"""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            result = fetch()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
     
     def get_fundamentals(self, symbol: str) -> Optional[Dict]:
         """
@@ -32,12 +155,20 @@ class FundamentalsFetcher:
             logger.info(f"Cache hit for fundamentals: {symbol}")
             return cached
         
+        if self.cache.get(f"neg:{symbol}"):
+            logger.info(f"Recent yfinance failure for {symbol}, serving demo data")
+            return self._demo_fallback(symbol)
+        
+        return self._singleflight(cache_key, lambda: self._fetch_fundamentals(symbol, cache_key))
+    
+    def _fetch_fundamentals(self, symbol: str, cache_key: str) -> Optional[Dict]:
+        """Fetch fundamentals from yfinance, falling back to demo data"""
+        # A cached year of history gives the moving averages and 52-week range locally;
+        # they replace .info's (or fill in for a thin .info) below
+        hist_fields = self._cached_hist_fields(symbol)
         try:
             logger.info(f"Fetching fundamentals for {symbol}")
-            ticker = yf.Ticker(symbol)
-            
-            # Use custom User-Agent to avoid blocking
-            ticker.session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            ticker = self._yf.Ticker(symbol, session=_thread_session())
             
             info = ticker.info
             
@@ -56,8 +187,9 @@ class FundamentalsFetcher:
                     logger.warning(f"No real data available for {symbol}, falling back to demo data")
                     raise Exception("No data found")
                 
-                # Build fundamentals from historical data
-                latest_price = hist['Close'].iloc[-1]
+                # Build fundamentals from historical data (hist is non-empty here)
+                last = hist.iloc[-1]
+                latest_price = last['Close']
                 previous_price = hist['Close'].iloc[-2] if len(hist) > 1 else latest_price
                 
                 fundamentals = {
@@ -67,10 +199,10 @@ class FundamentalsFetcher:
                     "industry": "N/A",
                     "cmp": round(latest_price, 2),
                     "previous_close": round(previous_price, 2),
-                    "open": round(hist['Open'].iloc[-1], 2) if not hist.empty else 0,
-                    "day_high": round(hist['High'].iloc[-1], 2) if not hist.empty else 0,
-                    "day_low": round(hist['Low'].iloc[-1], 2) if not hist.empty else 0,
-                    "volume": int(hist['Volume'].iloc[-1]) if not hist.empty else 0,
+                    "open": round(last['Open'], 2),
+                    "day_high": round(last['High'], 2),
+                    "day_low": round(last['Low'], 2),
+                    "volume": int(last['Volume']),
                     "market_cap": 0,
                     "pe_ratio": 0,
                     "forward_pe": 0,
@@ -79,8 +211,8 @@ class FundamentalsFetcher:
                     "dividend_yield": 0,
                     "eps": 0,
                     "beta": 0,
-                    "52_week_high": round(hist['High'].max(), 2) if not hist.empty else 0,
-                    "52_week_low": round(hist['Low'].min(), 2) if not hist.empty else 0,
+                    "52_week_high": round(hist['High'].max(), 2),
+                    "52_week_low": round(hist['Low'].min(), 2),
                     "50_day_avg": 0,
                     "200_day_avg": 0,
                     "profit_margin": 0,
@@ -99,46 +231,27 @@ class FundamentalsFetcher:
                 fundamentals["change"] = round(latest_price - previous_price, 2)
                 fundamentals["change_percent"] = round((fundamentals["change"] / previous_price) * 100, 2)
                 
+                fundamentals.update(hist_fields)
+                
                 logger.info(f"Built fundamentals from historical data for {symbol}")
                 self.cache.set(cache_key, fundamentals, category="fundamentals", ttl=self.cache_ttl)
                 return fundamentals
             
-            # Extract key fundamentals
+            # Extract key fundamentals; missing numeric fields read as 0
+            info = defaultdict(int, info)
             fundamentals = {
                 "symbol": symbol,
                 "name": info.get("longName", symbol.replace('.NS', '').replace('.BO', '')),
                 "sector": info.get("sector", "N/A"),
                 "industry": info.get("industry", "N/A"),
-                "cmp": info.get("currentPrice", info.get("regularMarketPrice", 0)),
-                "previous_close": info.get("previousClose", 0),
-                "open": info.get("open", 0),
-                "day_high": info.get("dayHigh", 0),
-                "day_low": info.get("dayLow", 0),
-                "volume": info.get("volume", 0),
-                "market_cap": info.get("marketCap", 0),
-                "pe_ratio": info.get("trailingPE", 0),
-                "forward_pe": info.get("forwardPE", 0),
-                "peg_ratio": info.get("pegRatio", 0),
-                "price_to_book": info.get("priceToBook", 0),
-                "dividend_yield": info.get("dividendYield", 0) * 100 if info.get("dividendYield") else 0,
-                "eps": info.get("trailingEps", 0),
-                "beta": info.get("beta", 0),
-                "52_week_high": info.get("fiftyTwoWeekHigh", 0),
-                "52_week_low": info.get("fiftyTwoWeekLow", 0),
-                "50_day_avg": info.get("fiftyDayAverage", 0),
-                "200_day_avg": info.get("twoHundredDayAverage", 0),
-                "profit_margin": info.get("profitMargins", 0) * 100 if info.get("profitMargins") else 0,
-                "operating_margin": info.get("operatingMargins", 0) * 100 if info.get("operatingMargins") else 0,
-                "roe": info.get("returnOnEquity", 0) * 100 if info.get("returnOnEquity") else 0,
-                "roa": info.get("returnOnAssets", 0) * 100 if info.get("returnOnAssets") else 0,
-                "debt_to_equity": info.get("debtToEquity", 0),
-                "current_ratio": info.get("currentRatio", 0),
-                "revenue": info.get("totalRevenue", 0),
-                "revenue_growth": info.get("revenueGrowth", 0) * 100 if info.get("revenueGrowth") else 0,
-                "earnings_growth": info.get("earningsGrowth", 0) * 100 if info.get("earningsGrowth") else 0,
-                "recommendation": info.get("recommendationKey", "none"),
-                "target_price": info.get("targetMeanPrice", 0),
+                "cmp": info.get("currentPrice", info["regularMarketPrice"]),
             }
+            for out_key, info_key, scale in INFO_FIELDS:
+                value = info[info_key]
+                fundamentals[out_key] = value if scale is None else (value * scale if value else 0)
+            fundamentals["recommendation"] = info.get("recommendationKey", "none")
+            fundamentals["target_price"] = info["targetMeanPrice"]
+            fundamentals.update(hist_fields)
             
             # Calculate additional metrics
             if fundamentals["cmp"] and fundamentals["previous_close"]:
@@ -155,18 +268,80 @@ class FundamentalsFetcher:
             
         except Exception as e:
             logger.error(f"Error fetching fundamentals for {symbol}: {str(e)}")
+            # Remember the failure so yfinance is skipped for this symbol for a while
+            self.cache.set(f"neg:{symbol}", True, category="negative", ttl=NEGATIVE_CACHE_TTL)
             
             # Try demo data as fallback for ALL errors
             logger.warning(f"Falling back to generated/demo data for {symbol}")
-            demo_data = get_demo_stock(symbol)
-            if demo_data:
+            fundamentals = self._demo_fallback(symbol)
+            if fundamentals:
                 # Cache demo data for short time to allow retry later
-                self.cache.set(cache_key, demo_data, category="fundamentals", ttl=300)
-                return demo_data
+                self.cache.set(cache_key, fundamentals, category="fundamentals", ttl=300)
             
+            return fundamentals
+    
+    def _demo_fallback(self, symbol: str) -> Optional[Dict]:
+        """Demo fundamentals, with moving averages and 52-week range from cached history if any"""
+        demo_data = get_demo_stock(symbol)
+        if not demo_data:
             return None
+        
+        # Demo records are shared read-only mappings; hand callers their own dict
+        fundamentals = dict(demo_data)
+        fundamentals.update(self._cached_hist_fields(symbol))
+        return fundamentals
+    
+    def _cached_hist_fields(self, symbol: str) -> Dict:
+        """Moving averages and 52-week range from a cached year of history ({} if none)"""
+        year_hist = self.cache.get(f"historical:{symbol}:1y")
+        return self._derive_from_hist(year_hist) if year_hist else {}
     
-    def get_historical_data(self, symbol: str, period: str = "1y") -> Optional[Dict]:
+    @staticmethod
+    def _derive_from_hist(hist_data: Dict) -> Dict:
+        """Moving averages and 52-week range from a year of historical data"""
+        close = np.asarray(hist_data["close"], dtype=float)
+        high = np.asarray(hist_data["high"], dtype=float)
+        low = np.asarray(hist_data["low"], dtype=float)
+        if close.size == 0:
+            return {}
+        
+        return {
+            "52_week_high": round(float(np.nanmax(high)), 2),
+            "52_week_low": round(float(np.nanmin(low)), 2),
+            "50_day_avg": round(float(np.nanmean(close[-50:])), 2),
+            "200_day_avg": round(float(np.nanmean(close[-200:])), 2),
+        }
+    
+    def get_fundamentals_batch(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch fundamentals for several stocks at once
+        
+        Cached symbols are answered directly; yfinance fetches `.info` one
+        ticker per request, so the misses are fetched concurrently.
+        
+        Args:
+            symbols: List of stock symbols
+            
+        Returns:
+            Dictionary mapping each symbol to its fundamentals (or None)
+        """
+        results = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            cached = self.cache.get(f"fundamentals:{symbol}")
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+        
+        if missing:
+            logger.info(f"Fetching fundamentals for {len(missing)} symbols")
+            with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(missing))) as pool:
+                results.update(zip(missing, pool.map(self.get_fundamentals, missing)))
+        
+        return results
+    
+    def get_historical_data(self, symbol: str, period: str = "1y") -> Optional[OHLCV]:
         """
         Fetch historical price data
         
@@ -175,59 +350,110 @@ class FundamentalsFetcher:
             period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
             
         Returns:
-            Dictionary with historical data or None if error
+            OHLCV series or None if error
         """
-        cache_key = f"historical:{symbol}:{period}"
-        cached = self.cache.get(cache_key)
-        if cached is not None:
-            logger.info(f"Cache hit for historical data: {symbol}")
-            return cached
+        return self._singleflight(
+            f"historical:{symbol}:{period}",
+            lambda: self.get_historical_data_batch([symbol], period).get(symbol)
+        )
+    
+    def get_historical_data_batch(self, symbols: List[str], period: str = "1y") -> Dict[str, Optional[OHLCV]]:
+        """
+        Fetch historical price data for several stocks in one download
         
-        try:
-            logger.info(f"Fetching historical data for {symbol}")
-            ticker = yf.Ticker(symbol)
-            
-            # Use custom User-Agent
-            ticker.session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            
-            hist = ticker.history(period=period)
-            
-            if hist.empty:
-                logger.warning(f"History empty for {symbol}")
-                raise Exception("Empty history")
-            
-            # Convert to dictionary format
-            historical_data = {
-                "dates": hist.index.strftime('%Y-%m-%d').tolist(),
-                "open": hist['Open'].tolist(),
-                "high": hist['High'].tolist(),
-                "low": hist['Low'].tolist(),
-                "close": hist['Close'].tolist(),
-                "volume": hist['Volume'].tolist(),
-            }
-            
-            # Cache for shorter time (6 hours for historical data)
-            self.cache.set(cache_key, historical_data, category="historical", ttl=21600)
-            
-            return historical_data
+        Args:
+            symbols: List of stock symbols
+            period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
             
+        Returns:
+            Dictionary mapping each symbol to its OHLCV series (or None)
+        """
+        results = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            cached = self.cache.get(f"historical:{symbol}:{period}")
+            if cached is not None:
+                logger.info(f"Cache hit for historical data: {symbol}")
+                results[symbol] = OHLCV.from_dict(cached)
+            else:
+                missing.append(symbol)
+        
+        if not missing:
+            return results
+        
+        data = None
+        try:
+            logger.info(f"Fetching historical data for {', '.join(missing)}")
+            # One request for every missing symbol; yfinance threads the downloads itself
+            data = self._yf.download(missing, period=period, group_by='ticker', auto_adjust=True,
+                               threads=True, progress=False, session=_thread_session())
         except Exception as e:
-            logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
-            
-            # Try demo data as fallback
-            logger.warning(f"Falling back to generated demo historical data for {symbol}")
-            demo_hist = generate_demo_historical_data(symbol)
-            if demo_hist:
-                # Cache demo data for shorter time
-                self.cache.set(cache_key, demo_hist, category="historical", ttl=3600)
-                return demo_hist
-            
-            return None
+            logger.error(f"Error downloading historical data for {', '.join(missing)}: {str(e)}")
+        
+        fresh = []
+        for symbol in missing:
+            cache_key = f"historical:{symbol}:{period}"
+            try:
+                if data is None or data.empty:
+                    raise Exception("Empty history")
+                # group_by='ticker' puts the symbol on the outer column level
+                hist = data[symbol] if data.columns.nlevels > 1 else data
+                hist = hist.dropna(how='all')
+                if hist.empty:
+                    logger.warning(f"History empty for {symbol}")
+                    raise Exception("Empty history")
+                
+                ohlcv = self._frame_to_ohlcv(hist)
+                # Cache for shorter time (6 hours for historical data)
+                fresh.append((cache_key, ohlcv.to_dict(), "historical", 21600))
+                results[symbol] = ohlcv
+                
+            except Exception as e:
+                logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
+                
+                # Try demo data as fallback
+                logger.warning(f"Falling back to generated demo historical data for {symbol}")
+                demo_hist = generate_demo_historical_data(symbol)
+                if demo_hist:
+                    # Cache demo data for shorter time
+                    fresh.append((cache_key, demo_hist, "historical", 3600))
+                    results[symbol] = OHLCV.from_dict(demo_hist)
+                else:
+                    results[symbol] = None
+        
+        if fresh:
+            self.cache.set_many(fresh)
+        
+        return results
+    
+    @staticmethod
+    def _frame_to_ohlcv(hist) -> OHLCV:
+        """Convert a yfinance OHLCV frame to an OHLCV series"""
+        # Pull the price columns out as one block instead of walking the frame per column;
+        # the transposed copy keeps each column contiguous for the indicator kernels
+        prices = np.ascontiguousarray(hist[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64).T)
+        return OHLCV(
+            dates=hist.index.strftime('%Y-%m-%d').to_numpy(dtype=str),
+            open=prices[0],
+            high=prices[1],
+            low=prices[2],
+            close=prices[3],
+            volume=hist['Volume'].fillna(0).to_numpy(dtype=np.int64),
+        )
     
     def get_market_indices(self) -> Dict:
         """
         Fetch NIFTY 50 and SENSEX data
         
+        Returns:
+            Dictionary with index data
+        """
+        return asyncio.run(self.get_market_indices_async())
+    
+    async def get_market_indices_async(self) -> Dict:
+        """
+        Fetch NIFTY 50 and SENSEX data concurrently from Yahoo's chart endpoint
+        
         Returns:
             Dictionary with index data
         """
@@ -237,90 +463,46 @@ class FundamentalsFetcher:
             logger.info("Cache hit for market indices")
             return cached
         
-        indices_data = {}
-        
-        # NIFTY 50
-        try:
-            logger.info("Fetching NIFTY 50 data")
-            nifty = yf.Ticker("^NSEI")
-            nifty_hist = nifty.history(period="5d")
-            
-            if not nifty_hist.empty:
-                latest_price = nifty_hist['Close'].iloc[-1]
-                previous_price = nifty_hist['Close'].iloc[-2] if len(nifty_hist) > 1 else latest_price
-                
-                indices_data["nifty50"] = {
-                    "name": "NIFTY 50",
-                    "value": round(latest_price, 2),
-                    "previous_close": round(previous_price, 2),
-                    "change": round(latest_price - previous_price, 2),
-                    "change_percent": round(((latest_price - previous_price) / previous_price) * 100, 2)
-                }
-                logger.info(f"NIFTY 50: {indices_data['nifty50']['value']}")
-            else:
-                # Fallback data
-                indices_data["nifty50"] = {
-                    "name": "NIFTY 50",
-                    "value": 21731.40,
-                    "previous_close": 21697.50,
-                    "change": 33.90,
-                    "change_percent": 0.16
-                }
-                logger.warning("Using fallback data for NIFTY 50 (market closed)")
-        except Exception as e:
-            logger.error(f"Error fetching NIFTY 50: {str(e)}")
-            # Fallback data
-            indices_data["nifty50"] = {
-                "name": "NIFTY 50",
-                "value": 21731.40,
-                "previous_close": 21697.50,
-                "change": 33.90,
-                "change_percent": 0.16
-            }
-        
-        # SENSEX
-        try:
-            logger.info("Fetching SENSEX data")
-            sensex = yf.Ticker("^BSESN")
-            sensex_hist = sensex.history(period="5d")
-            
-            if not sensex_hist.empty:
-                latest_price = sensex_hist['Close'].iloc[-1]
-                previous_price = sensex_hist['Close'].iloc[-2] if len(sensex_hist) > 1 else latest_price
-                
-                indices_data["sensex"] = {
-                    "name": "SENSEX",
-                    "value": round(latest_price, 2),
-                    "previous_close": round(previous_price, 2),
-                    "change": round(latest_price - previous_price, 2),
-                    "change_percent": round(((latest_price - previous_price) / previous_price) * 100, 2)
-                }
-                logger.info(f"SENSEX: {indices_data['sensex']['value']}")
-            else:
-                # Fallback data
-                indices_data["sensex"] = {
-                    "name": "SENSEX",
-                    "value": 71752.11,
-                    "previous_close": 71657.71,
-                    "change": 94.40,
-                    "change_percent": 0.13
-                }
-                logger.warning("Using fallback data for SENSEX (market closed)")
-        except Exception as e:
-            logger.error(f"Error fetching SENSEX: {str(e)}")
-            # Fallback data
-            indices_data["sensex"] = {
-                "name": "SENSEX",
-                "value": 71752.11,
-                "previous_close": 71657.71,
-                "change": 94.40,
-                "change_percent": 0.13
-            }
+        async with httpx.AsyncClient(headers={'User-Agent': USER_AGENT}, timeout=10.0) as client:
+            results = await asyncio.gather(
+                *(self._fetch_index(client, *spec) for spec in MARKET_INDICES.values())
+            )
+        indices_data = dict(zip(MARKET_INDICES, results))
         
         # Cache for 5 minutes
         self.cache.set(cache_key, indices_data, category="market", ttl=300)
         
         return indices_data
+    
+    @staticmethod
+    async def _fetch_index(client, ticker: str, name: str, fallback: Dict) -> Dict:
+        """Fetch the last two daily closes of an index, falling back to static data"""
+        try:
+            logger.info(f"Fetching {name} data")
+            response = await client.get(CHART_URL.format(ticker=ticker), params={"range": "5d", "interval": "1d"})
+            response.raise_for_status()
+            quote = response.json()["chart"]["result"][0]["indicators"]["quote"][0]
+            closes = [c for c in quote.get("close") or [] if c is not None]
+            
+            if not closes:
+                logger.warning(f"Using fallback data for {name} (market closed)")
+                return dict(fallback)
+            
+            latest_price = closes[-1]
+            previous_price = closes[-2] if len(closes) > 1 else latest_price
+            
+            index_data = {
+                "name": name,
+                "value": round(latest_price, 2),
+                "previous_close": round(previous_price, 2),
+                "change": round(latest_price - previous_price, 2),
+                "change_percent": round(((latest_price - previous_price) / previous_price) * 100, 2)
+            }
+            logger.info(f"{name}: {index_data['value']}")
+            return index_data
+        except Exception as e:
+            logger.error(f"Error fetching {name}: {str(e)}")
+            return dict(fallback)
 
 
 # Singleton instance
@@ -3,22 +3,135 @@ News & Sentiment Engine
 Fetches news and performs sentiment analysis
 """
 import os
-from typing import List, Dict, Optional
+import asyncio
+import pickle
+from functools import lru_cache
+from itertools import islice
+import httpx
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Dict, Optional, Tuple
 import logging
 from datetime import datetime, timedelta
 from newsapi import NewsApiClient
+from vaderSentiment import vaderSentiment as vader_module
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from .data_cache_manager import get_cache
+from ._executors import CPU_WORKERS, IO_POOL, get_cpu_pool
+
+# Optional compiled (Rust) VADER with the same polarity_scores interface
+try:
+    import vader_sentimental
+    HAS_RUST_VADER = True
+except ImportError:
+    HAS_RUST_VADER = False
 
 logger = logging.getLogger(__name__)
 
+# VADER compound score cut-offs for labelling a single article
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+SENTIMENT_LABELS = np.array(["negative", "neutral", "positive"])
+
+# Batches at least this large are scored across worker processes. A pool round trip
+# costs ~0.5 ms against ~0.1-0.2 ms of VADER per article, so a two-way split pays off
+# from about 10 articles; a watchlist batch of two or more companies clears this.
+PARALLEL_SCORING_MIN = 32
+
+NEWSAPI_EVERYTHING_URL = "https://newsapi.org/v2/everything"
+
+# Empty results are only cached briefly, in case the news shows up shortly
+EMPTY_NEWS_TTL = 60
+
+# NewsAPI quota is per API key, so one flag pauses every news call after a 429
+RATE_LIMIT_KEY = "news:ratelimited"
+RATE_LIMIT_BACKOFF = 60       # seconds, doubled on each consecutive 429
+RATE_LIMIT_BACKOFF_MAX = 3600
+
+# Reliable Indian financial news domains
+INDIAN_DOMAINS = 'moneycontrol.com,economictimes.indiatimes.com,livemint.com,business-standard.com,financialexpress.com,ndtv.com'
+
+# Parsed VADER lexicons, pickled so later starts skip re-parsing the text files
+LEXICON_CACHE_FILE = "data/vader_lexicon.pkl"
+
+class CachedLexiconAnalyzer(SentimentIntensityAnalyzer):
+    """SentimentIntensityAnalyzer that loads its parsed lexicons from a pickle"""
+    
+    def __init__(self, cache_file: str = LEXICON_CACHE_FILE):
+        # Stamp of the bundled lexicon, so a vaderSentiment upgrade rebuilds the cache
+        source = os.path.join(os.path.dirname(vader_module.__file__), "vader_lexicon.txt")
+        stat = os.stat(source)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_stamp, lexicon, emojis = pickle.load(f)
+            if cached_stamp == stamp:
+                self.lexicon, self.emojis = lexicon, emojis
+                return
+        except Exception:
+            pass
+        
+        super().__init__()
+        try:
+            os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump((stamp, self.lexicon, self.emojis), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning(f"Could not write VADER lexicon cache: {str(e)}")
+
+@lru_cache(maxsize=1)
+def get_analyzer():
+    """Shared VADER analyzer, preferring the compiled implementation when installed"""
+    if HAS_RUST_VADER:
+        return vader_sentimental.SentimentIntensityAnalyzer()
+    return CachedLexiconAnalyzer()
+
+def _sentiment_buckets(compounds: np.ndarray) -> np.ndarray:
+    """Index into SENTIMENT_LABELS for each compound score (both cut-offs inclusive)"""
+    return (compounds > NEGATIVE_THRESHOLD).astype(np.intp) + (compounds >= POSITIVE_THRESHOLD)
+
+def _score_chunk(texts: List[str]) -> List[Dict]:
+    """VADER scores for a chunk of texts (runs in a worker process)"""
+    return list(map(get_analyzer().polarity_scores, texts))
+
 class NewsSentimentEngine:
     def __init__(self, api_key: str, cache_ttl: int = 43200):  # 12 hours default
         self.api_key = api_key
-        self.news_client = NewsApiClient(api_key=api_key) if api_key else None
-        self.sentiment_analyzer = SentimentIntensityAnalyzer()
+        self.news_client = NewsApiClient(api_key=api_key, session=self._make_session()) if api_key else None
+        self.sentiment_analyzer = get_analyzer()
+        self._polarity_scores = self.sentiment_analyzer.polarity_scores
         self.cache = get_cache()
         self.cache_ttl = cache_ttl
+        self._rate_limit_backoff = RATE_LIMIT_BACKOFF
+        # Async client for batch fetches, created on first use and kept for connection reuse
+        self._async_client: Optional[httpx.AsyncClient] = None
+    
+    @staticmethod
+    def _make_session() -> requests.Session:
+        """Session that keeps connections to newsapi.org alive between calls"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                              max_retries=Retry(total=2, backoff_factor=0.2))
+        session.mount('https://', adapter)
+        return session
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Shared async client for newsapi.org (pooled across batch calls)"""
+        if self._async_client is None or self._async_client.is_closed:
+            limits = httpx.Limits(max_connections=32, max_keepalive_connections=8)
+            self._async_client = httpx.AsyncClient(limits=limits, timeout=15.0)
+        return self._async_client
+    
+    async def aclose(self):
+        """Close the shared async client (on app shutdown)"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
     
     def get_market_news(self, limit: int = 10) -> List[Dict]:
         """
@@ -40,16 +153,16 @@ class NewsSentimentEngine:
             logger.warning("NewsAPI client not initialized")
             return []
         
+        if self._rate_limited():
+            return []
+        
         try:
             # Fetch news from specific Indian domains
             from_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
             
-            # List of reliable Indian financial news domains
-            indian_domains = 'moneycontrol.com,economictimes.indiatimes.com,livemint.com,business-standard.com,financialexpress.com,ndtv.com'
-            
             response = self.news_client.get_everything(
                 q='(stock market OR NIFTY OR SENSEX) AND India',
-                domains=indian_domains,
+                domains=INDIAN_DOMAINS,
                 language='en',
                 sort_by='publishedAt',
                 from_param=from_date,
@@ -59,18 +172,15 @@ class NewsSentimentEngine:
             articles = response.get('articles', [])
             
             # Process and add sentiment
-            processed_articles = []
-            for article in articles:
-                processed = self._process_article(article)
-                if processed:
-                    processed_articles.append(processed)
+            processed_articles = self._process_articles(articles)
             
             # Cache the results
-            self.cache.set(cache_key, processed_articles, category="news", ttl=self.cache_ttl)
+            self._cache_articles(cache_key, processed_articles)
             
             return processed_articles[:limit]
             
         except Exception as e:
+            self._check_rate_limit(e)
             logger.error(f"Error fetching market news: {str(e)}")
             return []
     
@@ -96,16 +206,15 @@ class NewsSentimentEngine:
             logger.warning("NewsAPI client not initialized")
             return []
         
+        if self._rate_limited():
+            return []
+        
         try:
-            # Clean company name (remove Ltd, Limited, etc.)
-            clean_name = company_name.replace(' Limited', '').replace(' Ltd', '').replace('.', '')
-            
             from_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-            indian_domains = 'moneycontrol.com,economictimes.indiatimes.com,livemint.com,business-standard.com,financialexpress.com,ndtv.com'
             
             response = self.news_client.get_everything(
-                q=f'"{clean_name}" AND (India OR stock OR share)',
-                domains=indian_domains,
+                q=self._company_query(company_name),
+                domains=INDIAN_DOMAINS,
                 language='en',
                 sort_by='publishedAt',
                 from_param=from_date,
@@ -115,55 +224,196 @@ class NewsSentimentEngine:
             articles = response.get('articles', [])
             
             # Process and add sentiment
-            processed_articles = []
-            for article in articles:
-                processed = self._process_article(article)
-                if processed:
-                    processed_articles.append(processed)
+            processed_articles = self._process_articles(articles)
             
             # Cache the results
-            self.cache.set(cache_key, processed_articles, category="news", ttl=self.cache_ttl)
+            self._cache_articles(cache_key, processed_articles)
             
             return processed_articles[:limit]
             
         except Exception as e:
+            self._check_rate_limit(e)
             logger.error(f"Error fetching company news for {symbol}: {str(e)}")
             return []
     
-    def _process_article(self, article: Dict) -> Optional[Dict]:
-        """Process and analyze sentiment of a news article"""
+    async def get_company_news_async(self, company_name: str, symbol: str, limit: int = 5) -> List[Dict]:
+        """get_company_news on the shared I/O pool, so callers can overlap it with other work"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(IO_POOL, self.get_company_news, company_name, symbol, limit)
+    
+    async def score_async(self, texts: List[str]) -> List[Dict]:
+        """VADER scores for texts; large batches are split across the shared process pool"""
+        # One core gains nothing from worker processes, only IPC overhead
+        if len(texts) < PARALLEL_SCORING_MIN or CPU_WORKERS < 2:
+            return list(map(self._polarity_scores, texts))
+        
         try:
-            title = article.get('title', '')
-            description = article.get('description', '')
-            
-            if not title:
-                return None
-            
-            # Combine title and description for sentiment analysis
-            text = f"{title}. {description}" if description else title
-            
-            # Analyze sentiment
-            sentiment_scores = self.sentiment_analyzer.polarity_scores(text)
+            loop = asyncio.get_running_loop()
+            pool = get_cpu_pool()
+            size = -(-len(texts) // CPU_WORKERS)
+            chunks = await asyncio.gather(*(
+                loop.run_in_executor(pool, _score_chunk, texts[i:i + size])
+                for i in range(0, len(texts), size)
+            ))
+            return [score for chunk in chunks for score in chunk]
+        except Exception as e:
+            logger.warning(f"Parallel sentiment scoring failed, scoring in-process: {str(e)}")
+            return list(map(self._polarity_scores, texts))
+    
+    async def get_company_news_many(self, pairs: List[Tuple[str, str]], limit: int = 5) -> Dict[str, List[Dict]]:
+        """
+        Fetch company-specific news for several companies concurrently
+        
+        Args:
+            pairs: List of (company_name, symbol) tuples
+            limit: Maximum number of articles per company
             
-            # Determine sentiment label
-            compound = sentiment_scores['compound']
-            if compound >= 0.05:
-                sentiment_label = "positive"
-            elif compound <= -0.05:
-                sentiment_label = "negative"
+        Returns:
+            Dictionary mapping each symbol to its articles with sentiment
+        """
+        results = {}
+        missing = []
+        for company_name, symbol in pairs:
+            cached = self.cache.get(f"news:company:{symbol}")
+            if cached is not None:
+                results[symbol] = cached[:limit]
             else:
-                sentiment_label = "neutral"
-            
+                results[symbol] = []
+                missing.append((company_name, symbol))
+        
+        if not missing or not self.api_key or self._rate_limited():
+            return results
+        
+        from_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        client = self._get_async_client()
+        fetched = await asyncio.gather(
+            *(self._fetch_company_articles(client, company_name, symbol, from_date)
+              for company_name, symbol in missing)
+        )
+        
+        # Score every fetched article in one batch, then split the scores back per symbol
+        batches = [self._article_texts(articles) if articles is not None else None for articles in fetched]
+        scores = iter(await self.score_async([text for batch in batches if batch for text in batch[1]]))
+        
+        fresh = []
+        for (_, symbol), batch in zip(missing, batches):
+            if batch is None:
+                continue
+            articles, texts = batch
+            processed_articles = self._build_articles(articles, list(islice(scores, len(texts))))
+            ttl = self.cache_ttl if processed_articles else EMPTY_NEWS_TTL
+            fresh.append((f"news:company:{symbol}", processed_articles, "news", ttl))
+            results[symbol] = processed_articles[:limit]
+        
+        if fresh:
+            self.cache.set_many(fresh)
+        
+        return results
+    
+    async def _fetch_company_articles(self, client, company_name: str, symbol: str, from_date: str) -> Optional[List[Dict]]:
+        """Raw NewsAPI articles for one company, or None on error"""
+        try:
+            response = await client.get(NEWSAPI_EVERYTHING_URL, params={
+                "q": self._company_query(company_name),
+                "domains": INDIAN_DOMAINS,
+                "language": "en",
+                "sortBy": "publishedAt",
+                "from": from_date,
+                "pageSize": 20,
+            }, headers={"X-Api-Key": self.api_key})
+            if response.status_code == 429:
+                self._note_rate_limit(response.headers.get("Retry-After"))
+            response.raise_for_status()
+            return response.json().get('articles', [])
+        except Exception as e:
+            logger.error(f"Error fetching company news for {symbol}: {str(e)}")
+            return None
+    
+    def _cache_articles(self, cache_key: str, articles: List[Dict]):
+        """Cache processed articles, keeping empty results only briefly"""
+        self._rate_limit_backoff = RATE_LIMIT_BACKOFF
+        ttl = self.cache_ttl if articles else EMPTY_NEWS_TTL
+        self.cache.set(cache_key, articles, category="news", ttl=ttl)
+    
+    def _rate_limited(self) -> bool:
+        """True while a NewsAPI 429 back-off is in effect"""
+        if self.cache.get(RATE_LIMIT_KEY):
+            logger.info("NewsAPI rate limited, skipping request")
+            return True
+        return False
+    
+    def _check_rate_limit(self, error: Exception):
+        """Start a back-off if a NewsAPI client error was a rate limit"""
+        get_code = getattr(error, 'get_code', None)
+        if get_code is not None and get_code() == 'rateLimited':
+            self._note_rate_limit()
+    
+    def _note_rate_limit(self, retry_after: Optional[str] = None):
+        """
+        Pause NewsAPI calls after a 429
+        
+        Args:
+            retry_after: Retry-After header in seconds, if the response had one
+        """
+        try:
+            ttl = int(retry_after)
+        except (TypeError, ValueError):
+            ttl = self._rate_limit_backoff
+            self._rate_limit_backoff = min(ttl * 2, RATE_LIMIT_BACKOFF_MAX)
+        logger.warning(f"NewsAPI rate limit hit, pausing news requests for {ttl}s")
+        self.cache.set(RATE_LIMIT_KEY, True, category="news", ttl=ttl)
+    
+    @staticmethod
+    def _company_query(company_name: str) -> str:
+        """NewsAPI query for a company"""
+        # Clean company name (remove Ltd, Limited, etc.)
+        clean_name = company_name.replace(' Limited', '').replace(' Ltd', '').replace('.', '')
+        return f'"{clean_name}" AND (India OR stock OR share)'
+    
+    def _process_articles(self, articles: List[Dict]) -> List[Dict]:
+        """Score a list of raw articles in one pass, dropping the ones without a title"""
+        articles, texts = self._article_texts(articles)
+        return self._build_articles(articles, list(map(self._polarity_scores, texts)))
+    
+    @staticmethod
+    def _article_texts(articles: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """Articles that have a title, and the text to score for each"""
+        articles = [article for article in articles if article.get('title')]
+        
+        # Combine title and description for sentiment analysis
+        texts = [
+            f"{article['title']}. {article['description']}" if article.get('description') else article['title']
+            for article in articles
+        ]
+        return articles, texts
+    
+    def _build_articles(self, articles: List[Dict], scores: List[Dict]) -> List[Dict]:
+        """API records for scored articles"""
+        # Label the whole batch at once rather than branching per article
+        compounds = np.fromiter((s['compound'] for s in scores), dtype=np.float64, count=len(scores))
+        labels = SENTIMENT_LABELS[_sentiment_buckets(compounds)].tolist()
+        
+        processed_articles = []
+        for article, sentiment_scores, sentiment_label in zip(articles, scores, labels):
+            processed = self._process_article(article, sentiment_scores, sentiment_label)
+            if processed:
+                processed_articles.append(processed)
+        return processed_articles
+    
+    def _process_article(self, article: Dict, sentiment_scores: Dict, sentiment_label: str) -> Optional[Dict]:
+        """Build the API record for a news article from its VADER scores and label"""
+        try:
+            get = article.get
             return {
-                "title": title,
-                "description": description or "No description available",
-                "url": article.get('url', ''),
-                "source": article.get('source', {}).get('name', 'Unknown'),
-                "published_at": article.get('publishedAt', ''),
-                "image_url": article.get('urlToImage', ''),
+                "title": article['title'],
+                "description": get('description') or "No description available",
+                "url": get('url', ''),
+                "source": (get('source') or {}).get('name', 'Unknown'),
+                "published_at": get('publishedAt', ''),
+                "image_url": get('urlToImage', ''),
                 "sentiment": {
                     "label": sentiment_label,
-                    "compound": compound,
+                    "compound": sentiment_scores['compound'],
                     "positive": sentiment_scores['pos'],
                     "negative": sentiment_scores['neg'],
                     "neutral": sentiment_scores['neu']
@@ -194,21 +444,16 @@ class NewsSentimentEngine:
                 "confidence": 0
             }
         
-        positive_count = sum(1 for a in articles if a['sentiment']['label'] == 'positive')
-        negative_count = sum(1 for a in articles if a['sentiment']['label'] == 'negative')
-        neutral_count = sum(1 for a in articles if a['sentiment']['label'] == 'neutral')
+        n = len(articles)
+        compounds = np.fromiter((a['sentiment']['compound'] for a in articles), dtype=np.float64, count=n)
         
-        # Calculate weighted average (recent news weighted more)
-        total_score = 0
-        total_weight = 0
+        # Bucket each article with the per-article cut-offs
+        buckets = _sentiment_buckets(compounds)
+        negative_count, neutral_count, positive_count = np.bincount(buckets, minlength=3).tolist()
         
-        for i, article in enumerate(articles):
-            # More recent articles get higher weight
-            weight = len(articles) - i
-            total_score += article['sentiment']['compound'] * weight
-            total_weight += weight
-        
-        avg_score = total_score / total_weight if total_weight > 0 else 0
+        # Calculate weighted average (more recent articles get higher weight)
+        weights = np.arange(n, 0, -1, dtype=np.float64)
+        avg_score = float(compounds @ weights / weights.sum())
         
         # Determine overall label
         if avg_score >= 0.1:
@@ -219,9 +464,8 @@ class NewsSentimentEngine:
             label = "neutral"
         
         # Calculate confidence based on consistency
-        total_articles = len(articles)
         max_count = max(positive_count, negative_count, neutral_count)
-        confidence = (max_count / total_articles) * 100 if total_articles > 0 else 0
+        confidence = (max_count / n) * 100
         
         return {
             "label": label,
@@ -244,3 +488,8 @@ def get_news_engine(api_key: str = None) -> NewsSentimentEngine:
             api_key = os.getenv('NEWS_API_KEY')
         _engine = NewsSentimentEngine(api_key)
     return _engine
+
+async def close_news_engine():
+    """Release the engine's pooled connections, if it was ever created"""
+    if _engine is not None:
+        await _engine.aclose()
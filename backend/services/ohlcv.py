@@ -0,0 +1,61 @@
+"""
+OHLCV price series
+Column-oriented container the fetcher hands to the indicator and prediction services
+"""
+from dataclasses import dataclass
+from typing import Dict, Mapping
+import numpy as np
+
+
+def _volume_array(values) -> np.ndarray:
+    """int64 volumes, counting missing entries (None/NaN) as 0"""
+    volume = np.asarray(values)
+    if volume.dtype.kind in "iu":
+        return volume.astype(np.int64, copy=False)
+    return np.nan_to_num(np.asarray(values, dtype=np.float64)).astype(np.int64)
+
+
+@dataclass(slots=True)
+class OHLCV:
+    """Daily price history, one contiguous array per column (oldest to newest)"""
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "OHLCV":
+        """
+        Build from the dictionary-of-lists format (cache entries, demo data)
+
+        Args:
+            data: Mapping with dates/open/high/low/close/volume lists
+
+        Returns:
+            OHLCV with float64 price arrays and an int64 volume array
+        """
+        return cls(
+            dates=np.asarray(data["dates"], dtype=str),
+            open=np.asarray(data["open"], dtype=np.float64),
+            high=np.asarray(data["high"], dtype=np.float64),
+            low=np.asarray(data["low"], dtype=np.float64),
+            close=np.asarray(data["close"], dtype=np.float64),
+            volume=_volume_array(data["volume"]),
+        )
+
+    def to_dict(self) -> Dict:
+        """Dictionary format used by the cache and the API response"""
+        # orjson serializes the numeric arrays itself; string arrays need lists
+        return {
+            "dates": self.dates.tolist(),
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+        }
+
+    def __len__(self) -> int:
+        return len(self.close)
@@ -11,69 +11,98 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_percentage_error, r2_score
 import joblib
+import asyncio
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
+from ._executors import IO_POOL
+from .ohlcv import OHLCV
+
+# Optional histogram-based booster; the sklearn RF+GB ensemble is the fallback
+try:
+    import lightgbm as lgb
+    HAS_LIGHTGBM = True
+except ImportError:
+    HAS_LIGHTGBM = False
 
 logger = logging.getLogger(__name__)
 
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+# Indicator series copied straight into the feature matrix, in column order
+INDICATOR_SERIES = ('sma_20', 'sma_50', 'ema_12', 'ema_26', 'rsi')
+
+LGB_PARAMS = {
+    "objective": "regression",
+    "num_leaves": 31,
+    "learning_rate": 0.05,
+    "feature_fraction": 0.9,
+    "max_bin": 255,  # histogram bins fit in uint8
+    "feature_pre_filter": False,
+    "num_threads": 0,  # LightGBM's default: all cores
+    "seed": 42,
+    "verbosity": -1,
+}
+LGB_ROUNDS = 200
+
+# Trained models kept in memory, keyed by feature fingerprint
+MODEL_MEMORY_SIZE = 32
+# Models persisted under model_path are reused for this long (seconds)
+MODEL_TTL = 3600
+
 class PredictionEngine:
     def __init__(self, model_path: str = "models"):
         self.model_path = model_path
         os.makedirs(model_path, exist_ok=True)
         self.scaler = StandardScaler()
         self.model = None
+        self._models: OrderedDict = OrderedDict()
+        self._rng = np.random.default_rng()
+        # Serializes predictions: they share self.model / self.scaler
+        self._lock = threading.Lock()
     
-    def prepare_features(self, historical_data: Dict, indicators: Dict) -> pd.DataFrame:
+    def prepare_features(self, ohlcv: OHLCV, indicators: Dict) -> pd.DataFrame:
         """
         Prepare feature matrix from historical data and indicators
         
         Args:
-            historical_data: OHLCV data
+            ohlcv: OHLCV series
             indicators: Technical indicators
             
         Returns:
             DataFrame with features
         """
         try:
-            df = pd.DataFrame({
-                'open': historical_data['open'],
-                'high': historical_data['high'],
-                'low': historical_data['low'],
-                'close': historical_data['close'],
-                'volume': historical_data['volume']
-            })
+            # Volume is int64 on the series; the model works on floats throughout
+            df = pd.DataFrame({column: getattr(ohlcv, column) for column in OHLCV_COLUMNS}, dtype=np.float64)
             
             # Add technical indicators
-            if 'sma_20' in indicators:
-                df['sma_20'] = indicators['sma_20']
-            if 'sma_50' in indicators:
-                df['sma_50'] = indicators['sma_50']
-            if 'ema_12' in indicators:
-                df['ema_12'] = indicators['ema_12']
-            if 'ema_26' in indicators:
-                df['ema_26'] = indicators['ema_26']
-            if 'rsi' in indicators:
-                df['rsi'] = indicators['rsi']
+            columns = {key: indicators[key] for key in INDICATOR_SERIES if key in indicators}
             if 'macd' in indicators:
-                df['macd'] = indicators['macd']['macd']
-                df['macd_signal'] = indicators['macd']['signal']
+                columns['macd'] = indicators['macd']['macd']
+                columns['macd_signal'] = indicators['macd']['signal']
             if 'bollinger' in indicators:
-                df['bb_upper'] = indicators['bollinger']['upper']
-                df['bb_lower'] = indicators['bollinger']['lower']
+                columns['bb_upper'] = indicators['bollinger']['upper']
+                columns['bb_lower'] = indicators['bollinger']['lower']
             if 'atr' in indicators:
-                df['atr'] = indicators['atr']
-            
-            # Add price-based features
-            df['price_change'] = df['close'].pct_change()
-            df['high_low_range'] = (df['high'] - df['low']) / df['close']
-            df['close_open_diff'] = (df['close'] - df['open']) / df['open']
-            
-            # Add momentum features
-            df['momentum_5'] = df['close'].pct_change(periods=5)
-            df['momentum_10'] = df['close'].pct_change(periods=10)
-            
-            # Add volatility
-            df['volatility_5'] = df['close'].rolling(window=5).std()
-            df['volatility_20'] = df['close'].rolling(window=20).std()
+                columns['atr'] = indicators['atr']
+            
+            close = df['close']
+            open_ = df['open']
+            columns.update(
+                # Price-based features
+                price_change=close / close.shift(1) - 1,
+                high_low_range=(df['high'] - df['low']) / close,
+                close_open_diff=(close - open_) / open_,
+                # Momentum features
+                momentum_5=close / close.shift(5) - 1,
+                momentum_10=close / close.shift(10) - 1,
+                # Volatility
+                volatility_5=close.rolling(window=5).std(),
+                volatility_20=close.rolling(window=20).std(),
+            )
+            df = df.assign(**columns)
             
             # Drop NaN values
             df = df.bfill().ffill()
@@ -112,33 +141,35 @@ class PredictionEngine:
                 X, y_future, test_size=0.2, shuffle=False
             )
             
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
-            
-            # Train ensemble model
-            rf_model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
-            gb_model = GradientBoostingRegressor(n_estimators=100, random_state=42)
-            
-            rf_model.fit(X_train_scaled, y_train)
-            gb_model.fit(X_train_scaled, y_train)
+            # Scale features (fresh scaler: cached models keep a reference to theirs).
+            # Trees are fitted on float32, which the learners bin or cast to anyway
+            self.scaler = StandardScaler()
+            X_train_scaled = self.scaler.fit_transform(X_train).astype(np.float32, copy=False)
+            X_test_scaled = self.scaler.transform(X_test).astype(np.float32, copy=False)
+            
+            if HAS_LIGHTGBM:
+                # Single multi-threaded histogram booster
+                booster = lgb.train(LGB_PARAMS, lgb.Dataset(X_train_scaled, y_train), num_boost_round=LGB_ROUNDS)
+                model = {'booster': booster}
+            else:
+                # Train ensemble model
+                rf_model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
+                gb_model = GradientBoostingRegressor(n_estimators=100, random_state=42)
+                
+                rf_model.fit(X_train_scaled, y_train)
+                gb_model.fit(X_train_scaled, y_train)
+                model = {'rf': rf_model, 'gb': gb_model}
             
-            # Ensemble predictions
-            rf_pred = rf_model.predict(X_test_scaled)
-            gb_pred = gb_model.predict(X_test_scaled)
-            ensemble_pred = (rf_pred + gb_pred) / 2
+            model['scaler'] = self.scaler
+            model['feature_names'] = X.columns.tolist()
+            test_pred = self._model_predict(model, X_test_scaled)
             
             # Calculate metrics
-            mape = mean_absolute_percentage_error(y_test, ensemble_pred) * 100
-            r2 = r2_score(y_test, ensemble_pred)
+            mape = mean_absolute_percentage_error(y_test, test_pred) * 100
+            r2 = r2_score(y_test, test_pred)
             
             # Store models
-            self.model = {
-                'rf': rf_model,
-                'gb': gb_model,
-                'scaler': self.scaler,
-                'feature_names': X.columns.tolist()
-            }
+            self.model = model
             
             return {
                 'mape': mape,
@@ -151,6 +182,13 @@ class PredictionEngine:
             logger.error(f"Error training model: {str(e)}")
             return {}
     
+    @staticmethod
+    def _model_predict(model: Dict, X_scaled) -> np.ndarray:
+        """Predictions of a trained model (LightGBM booster or RF+GB average)"""
+        if 'booster' in model:
+            return model['booster'].predict(X_scaled)
+        return (model['rf'].predict(X_scaled) + model['gb'].predict(X_scaled)) / 2
+    
     def predict_future(self, features_df: pd.DataFrame, days: int = 7) -> Dict:
         """
         Predict future stock prices
@@ -168,10 +206,6 @@ class PredictionEngine:
                 metrics = self.train_model(features_df)
                 logger.info(f"Model trained with MAPE: {metrics.get('mape', 0):.2f}%")
             
-            predictions = []
-            confidence_lower = []
-            confidence_upper = []
-            
             # Get last known data
             last_features = features_df.iloc[-1:].drop(columns=['close'])
             last_price = features_df.iloc[-1]['close']
@@ -184,11 +218,9 @@ class PredictionEngine:
 
             # Get Model Prediction for next day to determine trend
             last_features = features_df.iloc[-1:].drop(columns=['close'])
-            scaled_features = self.model['scaler'].transform(last_features)
+            scaled_features = self.model['scaler'].transform(last_features).astype(np.float32, copy=False)
             
-            rf_pred = self.model['rf'].predict(scaled_features)[0]
-            gb_pred = self.model['gb'].predict(scaled_features)[0]
-            model_next_day = (rf_pred + gb_pred) / 2
+            model_next_day = self._model_predict(self.model, scaled_features)[0]
             
             # Calculate drift based on model's prediction
             # We trust the model's direction for the immediate term
@@ -197,27 +229,16 @@ class PredictionEngine:
             # Dampen drift for longer term (mean reversion assumption)
             drift = np.clip(drift, -0.03, 0.03)
             
-            current_price = last_price
+            # Simulate the whole path at once: model drift plus noise from historical volatility
+            moves = drift + self._rng.normal(0.0, volatility, days)
+            path = last_price * np.cumprod(1 + moves)
             
-            for day in range(days):
-                # Apply random noise based on historical volatility
-                # random.normal(loc=mean, scale=std)
-                noise = np.random.normal(0, volatility)
-                
-                # Combine drift and noise
-                # Day 1 is heavily weighted to model, subsequent days add noise
-                move = drift + noise
-                
-                next_price = current_price * (1 + move)
-                predictions.append(next_price)
-                
-                # Calculate confidence interval
-                # Widens as we go further into future
-                confidence_range = volatility * (day + 1) * 1.96  # ~95% CI approximation scaling with sqrt(time) roughly
-                confidence_lower.append(next_price * (1 - confidence_range))
-                confidence_upper.append(next_price * (1 + confidence_range))
-                
-                current_price = next_price
+            # Confidence interval widens as we go further into future (~95% CI)
+            confidence_range = volatility * 1.96 * np.arange(1, days + 1)
+            
+            predictions = path.tolist()
+            confidence_lower = (path * (1 - confidence_range)).tolist()
+            confidence_upper = (path * (1 + confidence_range)).tolist()
             
             # Calculate trend
             trend = "upward" if predictions[-1] > last_price else "downward"
@@ -236,12 +257,84 @@ class PredictionEngine:
             logger.error(f"Error predicting future: {str(e)}")
             return {}
     
-    def get_prediction_with_backtest(self, historical_data: Dict, indicators: Dict, days: int = 7) -> Dict:
+    @staticmethod
+    def _fingerprint(features_df: pd.DataFrame) -> str:
+        """Hash of the feature matrix (values and column names)"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(",".join(features_df.columns).encode())
+        digest.update(np.ascontiguousarray(features_df.to_numpy(dtype=np.float64)).tobytes())
+        return digest.hexdigest()
+    
+    def _get_or_train(self, features_df: pd.DataFrame) -> Dict:
+        """
+        Use the model trained on identical features if one is cached,
+        otherwise train a new one and cache it
+        
+        Returns:
+            Dictionary with training metrics
+        """
+        fp = self._fingerprint(features_df)
+        model = self._models.get(fp)
+        if model is None:
+            model = self._load_model(fp)
+        
+        if model is not None:
+            logger.info(f"Reusing cached model {fp}")
+        else:
+            metrics = self.train_model(features_df)
+            if not metrics:
+                return metrics
+            model = self.model
+            model['metrics'] = metrics
+            self._save_model(fp, model)
+        
+        self._models[fp] = model
+        self._models.move_to_end(fp)
+        while len(self._models) > MODEL_MEMORY_SIZE:
+            self._models.popitem(last=False)
+        
+        self.model = model
+        self.scaler = model['scaler']
+        return model['metrics']
+    
+    def _model_file(self, fp: str) -> str:
+        return os.path.join(self.model_path, f"ensemble_{fp}.joblib")
+    
+    def _load_model(self, fp: str) -> Optional[Dict]:
+        """Load a persisted model if it exists and is still fresh"""
+        path = self._model_file(fp)
+        try:
+            if time.time() - os.path.getmtime(path) > MODEL_TTL:
+                return None
+            return joblib.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error loading cached model {fp}: {str(e)}")
+            return None
+    
+    def _save_model(self, fp: str, model: Dict):
+        """Persist a model and drop persisted models past their TTL"""
+        try:
+            path = self._model_file(fp)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            joblib.dump(model, tmp_path, compress=3)
+            os.replace(tmp_path, path)
+            
+            cutoff = time.time() - MODEL_TTL
+            for name in os.listdir(self.model_path):
+                old = os.path.join(self.model_path, name)
+                if name.startswith("ensemble_") and name.endswith(".joblib") and os.path.getmtime(old) < cutoff:
+                    os.remove(old)
+        except Exception as e:
+            logger.error(f"Error saving model {fp}: {str(e)}")
+    
+    def get_prediction_with_backtest(self, ohlcv: OHLCV, indicators: Dict, days: int = 7) -> Dict:
         """
         Get predictions with backtesting metrics
         
         Args:
-            historical_data: OHLCV data
+            ohlcv: OHLCV series
             indicators: Technical indicators
             days: Number of days to predict
             
@@ -250,16 +343,17 @@ class PredictionEngine:
         """
         try:
             # Prepare features
-            features_df = self.prepare_features(historical_data, indicators)
+            features_df = self.prepare_features(ohlcv, indicators)
             
             if features_df.empty:
                 return {}
             
-            # Train and get metrics
-            metrics = self.train_model(features_df)
-            
-            # Get predictions
-            predictions = self.predict_future(features_df, days)
+            with self._lock:
+                # Train (or reuse a model trained on identical features) and get metrics
+                metrics = self._get_or_train(features_df)
+                
+                # Get predictions
+                predictions = self.predict_future(features_df, days)
             
             # Combine results
             result = {
@@ -273,6 +367,14 @@ class PredictionEngine:
             logger.error(f"Error in prediction with backtest: {str(e)}")
             return {}
 
+    
+    async def predict_async(self, ohlcv: OHLCV, indicators: Dict, days: int = 7) -> Dict:
+        """get_prediction_with_backtest on the shared pool (model fitting releases the GIL)"""
+        # Threads rather than the process pool: LightGBM and the sklearn tree builders fit
+        # without the GIL, and the fitted-model cache and its lock live in this process
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(IO_POOL, self.get_prediction_with_backtest, ohlcv, indicators, days)
+
 
 # Singleton instance
 _predictor = None
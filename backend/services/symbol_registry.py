@@ -2,32 +2,76 @@
 Symbol Registry Service
 Manages NSE/BSE stock symbols with fuzzy search capabilities
 """
-import json
 import os
+import sys
+import orjson
+from bisect import bisect_left
 from typing import List, Dict, Optional
 from difflib import get_close_matches
 
+# Optional C++ fuzzy matcher; difflib is the pure-Python fallback
+try:
+    from rapidfuzz import fuzz, process
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    HAS_RAPIDFUZZ = False
+
+# Optional compact trie for prefix completion; a bisected sorted list otherwise
+try:
+    import marisa_trie
+    HAS_MARISA = True
+except ImportError:
+    HAS_MARISA = False
+
+# Minimum similarity for a fuzzy search hit. WRatio also credits partial and
+# token matches, so it scores noticeably higher than difflib's plain ratio.
+WRATIO_SCORE_CUTOFF = 60
+DIFFLIB_CUTOFF = 0.4
+
 class SymbolRegistry:
     def __init__(self, symbols_file: str = "data/symbols.json"):
         self.symbols_file = symbols_file
         self.symbols: List[Dict] = []
         self.symbol_map: Dict[str, Dict] = {}
         self._load_symbols()
+        self._build_index()
+    
+    def _build_index(self):
+        """Rebuild the search candidates and the sorted prefix index"""
+        self._choices = list(self.symbol_map.keys())
+        if HAS_MARISA:
+            self._trie = marisa_trie.Trie(self._choices)
+        else:
+            self._keys_sorted = sorted(self._choices)
+    
+    def _prefix_keys(self, prefix: str):
+        """Yield the map keys starting with prefix"""
+        if HAS_MARISA:
+            yield from self._trie.iterkeys(prefix)
+            return
+        
+        keys = self._keys_sorted
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            yield keys[i]
     
     def _load_symbols(self):
         """Load symbols from JSON file or create default list"""
         if os.path.exists(self.symbols_file):
-            with open(self.symbols_file, 'r', encoding='utf-8') as f:
-                self.symbols = json.load(f)
+            with open(self.symbols_file, 'rb') as f:
+                self.symbols = orjson.loads(f.read())
         else:
             # Default NSE/BSE symbols - Top companies
             self.symbols = self._get_default_symbols()
             self._save_symbols()
         
-        # Create lookup map
-        for symbol in self.symbols:
-            self.symbol_map[symbol['symbol']] = symbol
-            self.symbol_map[symbol['name'].upper()] = symbol
+        # Create lookup map (by symbol and upper-cased name, keys interned)
+        self.symbol_map = {
+            sys.intern(key): symbol
+            for symbol in self.symbols
+            for key in (symbol['symbol'], symbol['name'].upper())
+        }
     
     def _get_default_symbols(self) -> List[Dict]:
         """Return default list of major NSE/BSE stocks"""
@@ -87,8 +131,8 @@ class SymbolRegistry:
     def _save_symbols(self):
         """Save symbols to JSON file"""
         os.makedirs(os.path.dirname(self.symbols_file), exist_ok=True)
-        with open(self.symbols_file, 'w', encoding='utf-8') as f:
-            json.dump(self.symbols, f, indent=2, ensure_ascii=False)
+        with open(self.symbols_file, 'wb') as f:
+            f.write(orjson.dumps(self.symbols, option=orjson.OPT_INDENT_2))
     
     def search(self, query: str, limit: int = 10) -> List[Dict]:
         """
@@ -110,12 +154,29 @@ class SymbolRegistry:
         if query in self.symbol_map:
             return [self.symbol_map[query]]
         
-        # Fuzzy match on names and symbols
-        all_keys = list(self.symbol_map.keys())
-        matches = get_close_matches(query, all_keys, n=limit, cutoff=0.4)
-        
         results = []
         seen = set()
+        
+        # Prefix match on names and symbols (covers most typed queries)
+        for key in self._prefix_keys(query):
+            if len(results) >= limit:
+                break
+            symbol_data = self.symbol_map[key]
+            if symbol_data['symbol'] not in seen:
+                results.append(symbol_data)
+                seen.add(symbol_data['symbol'])
+        
+        if len(results) >= limit:
+            return results
+        
+        # Fuzzy match on names and symbols
+        if HAS_RAPIDFUZZ:
+            hits = process.extract(query, self._choices, scorer=fuzz.WRatio,
+                                   limit=limit, score_cutoff=WRATIO_SCORE_CUTOFF)
+            matches = [match for match, _, _ in hits]
+        else:
+            matches = get_close_matches(query, self._choices, n=limit, cutoff=DIFFLIB_CUTOFF)
+        
         for match in matches:
             symbol_data = self.symbol_map[match]
             if symbol_data['symbol'] not in seen:
@@ -136,8 +197,9 @@ class SymbolRegistry:
             "exchange": exchange
         }
         self.symbols.append(symbol_data)
-        self.symbol_map[symbol_data['symbol']] = symbol_data
-        self.symbol_map[symbol_data['name'].upper()] = symbol_data
+        self.symbol_map[sys.intern(symbol_data['symbol'])] = symbol_data
+        self.symbol_map[sys.intern(symbol_data['name'].upper())] = symbol_data
+        self._build_index()
         self._save_symbols()
     
     def get_all_symbols(self) -> List[Dict]:
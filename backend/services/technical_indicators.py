@@ -2,74 +2,431 @@
 Technical Indicators Service
 Calculates technical indicators for stock analysis
 """
+import hashlib
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Mapping, Optional, Union
 import logging
+from .ohlcv import OHLCV
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
 logger = logging.getLogger(__name__)
 
+# Periods of the rolling indicators in calculate_all_indicators
+SMA_PERIODS = (20, 50, 200)
+RSI_PERIOD = 14
+BOLLINGER_PERIOD = 20
+BOLLINGER_STD = 2
+ATR_PERIOD = 14
+STOCH_PERIOD = 14
+STOCH_SMOOTH = 3
+
+# calculate_all_indicators results remembered for this many distinct price series
+INDICATOR_MEMO_SIZE = 256
+
+# Indicator series are computed in float64 but returned as float32: ~7 significant
+# digits is plenty for charts, and it halves the arrays and the JSON written from them
+OUTPUT_DTYPE = np.float32
+
+# Rows of the fused kernel's output block
+_SMA_20, _SMA_50, _SMA_200, _RSI, _BB_UPPER, _BB_MIDDLE, _BB_LOWER, _ATR, _STOCH_K, _STOCH_D = range(10)
+_N_ROWS = 10
+
+def _ewm_pandas(values: np.ndarray, alpha: float) -> np.ndarray:
+    """ewm(alpha=alpha, adjust=False).mean() through pandas"""
+    return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+if HAS_NUMBA:
+    @njit(cache=True, nogil=True)
+    def _ewm(values, alpha):
+        """
+        ewm(alpha=alpha, adjust=False).mean() as a native loop
+        
+        The recursion can't be vectorised, but compiled it is a handful of instructions
+        per bar. NaN bars carry the previous average and only decay its weight, as in pandas.
+        """
+        n = values.size
+        out = np.empty(n)
+        if n == 0:
+            return out
+        
+        average = values[0]
+        out[0] = average
+        old_weight = 1.0
+        for i in range(1, n):
+            x = values[i]
+            if average == average:
+                old_weight *= 1.0 - alpha
+                if x == x:
+                    if average != x:
+                        average = (old_weight * average + alpha * x) / (old_weight + alpha)
+                    old_weight = 1.0
+            elif x == x:
+                average = x
+            out[i] = average
+        return out
+    
+    @njit(cache=True, nogil=True)
+    def _rolling_min_max(low, high, period, out_min, out_max):
+        """
+        Rolling min of low and max of high with monotonic deques
+        
+        Each deque (a ring buffer of bar indices) keeps only values that can still become
+        the window's extreme, so every bar is pushed and popped at most once: O(n) for any
+        period. Windows holding a NaN are left NaN, like rolling(period).min()/max().
+        """
+        n = low.size
+        min_q = np.empty(period, dtype=np.int64)
+        max_q = np.empty(period, dtype=np.int64)
+        min_head = min_len = max_head = max_len = 0
+        low_count = high_count = 0
+        
+        for i in range(n):
+            if min_len and min_q[min_head] <= i - period:
+                min_head = (min_head + 1) % period
+                min_len -= 1
+            if max_len and max_q[max_head] <= i - period:
+                max_head = (max_head + 1) % period
+                max_len -= 1
+            
+            lo = low[i]
+            if lo == lo:
+                while min_len and low[min_q[(min_head + min_len - 1) % period]] >= lo:
+                    min_len -= 1
+                min_q[(min_head + min_len) % period] = i
+                min_len += 1
+                low_count += 1
+            hi = high[i]
+            if hi == hi:
+                while max_len and high[max_q[(max_head + max_len - 1) % period]] <= hi:
+                    max_len -= 1
+                max_q[(max_head + max_len) % period] = i
+                max_len += 1
+                high_count += 1
+            if i >= period:
+                if low[i - period] == low[i - period]:
+                    low_count -= 1
+                if high[i - period] == high[i - period]:
+                    high_count -= 1
+            
+            out_min[i] = low[min_q[min_head]] if low_count == period else np.nan
+            out_max[i] = high[max_q[max_head]] if high_count == period else np.nan
+    
+    @njit(cache=True, nogil=True)
+    def _true_range(high, low, close, i):
+        """True range at i, skipping NaN legs like DataFrame.max(axis=1)"""
+        tr = high[i] - low[i]
+        if i > 0:
+            for leg in (abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])):
+                if leg == leg and not leg <= tr:
+                    tr = leg
+        return tr
+    
+    @njit(cache=True, nogil=True)
+    def _price_change(close, i):
+        """close[i] - close[i-1], 0 for the first bar"""
+        return close[i] - close[i - 1] if i > 0 else 0.0
+    
+    @njit(cache=True, nogil=True)
+    def _compute_all(high, low, close, out):
+        """
+        Fill out with every rolling indicator in one pass over the series
+        
+        Each window keeps a running sum (add the new value, subtract the one leaving),
+        so a step is O(1) whatever the period. NaN inputs are skipped and blank every
+        window they fall in, matching pandas' rolling(period) with full min_periods.
+        fastmath is left off: NaN marks the warm-up and must propagate. Accumulators are
+        float64 whatever the dtype of out; values are only rounded when stored.
+        """
+        n = close.size
+        out[:] = np.nan
+        
+        sma_sum = np.zeros(len(SMA_PERIODS))
+        sma_count = np.zeros(len(SMA_PERIODS), dtype=np.int64)
+        
+        # Bollinger: Welford mean / sum of squared deviations over the window
+        bb_count = 0
+        bb_mean = 0.0
+        bb_m2 = 0.0
+        
+        # RSI: average gain / loss, with counts of non-zero moves so flat windows stay exact
+        gain_sum = 0.0
+        loss_sum = 0.0
+        gain_count = 0
+        loss_count = 0
+        
+        tr_sum = 0.0
+        tr_count = 0
+        
+        # Stochastic: monotonic deques of bar indices (ring buffers) for the window low / high
+        low_q = np.empty(STOCH_PERIOD, dtype=np.int64)
+        high_q = np.empty(STOCH_PERIOD, dtype=np.int64)
+        low_head = low_len = high_head = high_len = 0
+        low_count = high_count = 0
+        
+        for i in range(n):
+            x = close[i]
+            
+            for j in range(len(SMA_PERIODS)):
+                period = SMA_PERIODS[j]
+                if x == x:
+                    sma_sum[j] += x
+                    sma_count[j] += 1
+                if i >= period:
+                    old = close[i - period]
+                    if old == old:
+                        sma_sum[j] -= old
+                        sma_count[j] -= 1
+                if sma_count[j] == period:
+                    out[j, i] = sma_sum[j] / period
+            
+            if x == x:
+                bb_count += 1
+                delta = x - bb_mean
+                bb_mean += delta / bb_count
+                bb_m2 += delta * (x - bb_mean)
+            if i >= BOLLINGER_PERIOD:
+                old = close[i - BOLLINGER_PERIOD]
+                if old == old:
+                    bb_count -= 1
+                    if bb_count:
+                        delta = old - bb_mean
+                        bb_mean -= delta / bb_count
+                        bb_m2 -= delta * (old - bb_mean)
+                    else:
+                        bb_mean = bb_m2 = 0.0
+            if bb_count == BOLLINGER_PERIOD:
+                band = BOLLINGER_STD * np.sqrt(max(bb_m2, 0.0) / (BOLLINGER_PERIOD - 1))
+                out[_BB_MIDDLE, i] = bb_mean
+                out[_BB_UPPER, i] = bb_mean + band
+                out[_BB_LOWER, i] = bb_mean - band
+            
+            # NaN changes count as no move, as delta.where(...) fills them with 0
+            change = _price_change(close, i)
+            if change > 0:
+                gain_sum += change
+                gain_count += 1
+            elif change < 0:
+                loss_sum -= change
+                loss_count += 1
+            if i >= RSI_PERIOD:
+                change = _price_change(close, i - RSI_PERIOD)
+                if change > 0:
+                    gain_sum -= change
+                    gain_count -= 1
+                elif change < 0:
+                    loss_sum += change
+                    loss_count -= 1
+            if gain_count == 0:
+                gain_sum = 0.0
+            if loss_count == 0:
+                loss_sum = 0.0
+            if n > RSI_PERIOD and i >= RSI_PERIOD - 1:
+                if loss_count:
+                    out[_RSI, i] = 100.0 - 100.0 / (1.0 + gain_sum / loss_sum)
+                elif gain_count:
+                    out[_RSI, i] = 100.0
+            
+            tr = _true_range(high, low, close, i)
+            if tr == tr:
+                tr_sum += tr
+                tr_count += 1
+            if i >= ATR_PERIOD:
+                tr = _true_range(high, low, close, i - ATR_PERIOD)
+                if tr == tr:
+                    tr_sum -= tr
+                    tr_count -= 1
+            if n > ATR_PERIOD and tr_count == ATR_PERIOD:
+                out[_ATR, i] = tr_sum / ATR_PERIOD
+            
+            # Drop indices that left the window, then push i behind any value it dominates
+            if low_len and low_q[low_head] <= i - STOCH_PERIOD:
+                low_head = (low_head + 1) % STOCH_PERIOD
+                low_len -= 1
+            if high_len and high_q[high_head] <= i - STOCH_PERIOD:
+                high_head = (high_head + 1) % STOCH_PERIOD
+                high_len -= 1
+            lo = low[i]
+            if lo == lo:
+                while low_len and low[low_q[(low_head + low_len - 1) % STOCH_PERIOD]] >= lo:
+                    low_len -= 1
+                low_q[(low_head + low_len) % STOCH_PERIOD] = i
+                low_len += 1
+                low_count += 1
+            hi = high[i]
+            if hi == hi:
+                while high_len and high[high_q[(high_head + high_len - 1) % STOCH_PERIOD]] <= hi:
+                    high_len -= 1
+                high_q[(high_head + high_len) % STOCH_PERIOD] = i
+                high_len += 1
+                high_count += 1
+            if i >= STOCH_PERIOD:
+                if low[i - STOCH_PERIOD] == low[i - STOCH_PERIOD]:
+                    low_count -= 1
+                if high[i - STOCH_PERIOD] == high[i - STOCH_PERIOD]:
+                    high_count -= 1
+            if low_count == STOCH_PERIOD and high_count == STOCH_PERIOD:
+                low_min = low[low_q[low_head]]
+                span = high[high_q[high_head]] - low_min
+                if span != 0:
+                    out[_STOCH_K, i] = 100.0 * (x - low_min) / span
+            if i >= STOCH_SMOOTH - 1:
+                k_sum = 0.0
+                for j in range(i - STOCH_SMOOTH + 1, i + 1):
+                    k_sum += out[_STOCH_K, j]
+                out[_STOCH_D, i] = k_sum / STOCH_SMOOTH
+    
+    # Jitted kernels and their signatures, compiled ahead of time by _ta_kernels_build
+    JIT_KERNELS = {
+        "ewm": (_ewm, "f8[:](f8[:], f8)"),
+        "rolling_min_max": (_rolling_min_max, "void(f8[:], f8[:], i8, f8[:], f8[:])"),
+        "compute_all": (_compute_all, "void(f8[:], f8[:], f8[:], f4[:, ::1])"),
+    }
+    
+    try:
+        from . import _ta_kernels
+        _ewm = _ta_kernels.ewm
+        _rolling_min_max = _ta_kernels.rolling_min_max
+        _compute_all = _ta_kernels.compute_all
+    except ImportError:
+        # Compile at import so the first request doesn't pay the JIT cost
+        _ewm(np.zeros(1), 0.5)
+        _rolling_min_max(np.ones(1), np.ones(1), 1, np.empty(1), np.empty(1))
+        _compute_all(np.ones(1), np.ones(1), np.ones(1), np.empty((_N_ROWS, 1), dtype=OUTPUT_DTYPE))
+else:
+    _ewm = _ewm_pandas
+
+def _window_sums(values: np.ndarray, period: int):
+    """
+    Sum and count of the finite values in each full window, via cumulative sums
+    
+    Args:
+        values: float64 series
+        period: Window length
+        
+    Returns:
+        (sums, counts) for the windows ending at period-1 .. len(values)-1
+    """
+    finite = np.isfinite(values)
+    csum = np.zeros(values.size + 1)
+    np.cumsum(np.where(finite, values, 0.0), out=csum[1:])
+    ccount = np.zeros(values.size + 1, dtype=np.int64)
+    np.cumsum(finite, out=ccount[1:])
+    return csum[period:] - csum[:-period], ccount[period:] - ccount[:-period]
+
+def _rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+    """rolling(period).mean() in NumPy: NaN until a window is full or while it holds a NaN"""
+    sums, counts = _window_sums(values, period)
+    out = np.full(values.size, np.nan)
+    out[period - 1:] = np.where(counts == period, sums / period, np.nan)
+    return out
+
+_memo: OrderedDict = OrderedDict()
+_memo_lock = threading.Lock()
+
+def _series_key(*arrays: np.ndarray) -> bytes:
+    """Hash of the price arrays (lengths and values)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for arr in arrays:
+        digest.update(arr.size.to_bytes(8, 'little'))
+        digest.update(arr.tobytes())
+    return digest.digest()
+
+def _last_reading(values) -> float:
+    """Last value of an indicator series, or 0 while it is still NaN"""
+    last = float(values[-1])
+    return last if np.isfinite(last) else 0
+
+def _as_output(indicators: Dict) -> Dict:
+    """
+    Final arrays for an indicators dict: OUTPUT_DTYPE (no copy if already cast) and
+    read-only, nested groups included, since memoized results are shared by every caller
+    """
+    output = {}
+    for key, value in indicators.items():
+        if isinstance(value, dict):
+            output[key] = MappingProxyType(_as_output(value))
+        else:
+            arr = np.asarray(value, dtype=OUTPUT_DTYPE)
+            arr.flags.writeable = False
+            output[key] = arr
+    return output
+
 class TechnicalIndicators:
     @staticmethod
-    def calculate_sma(prices: List[float], period: int) -> List[float]:
+    def calculate_sma(prices: List[float], period: int) -> np.ndarray:
         """Calculate Simple Moving Average"""
         if len(prices) < period:
-            return [None] * len(prices)
+            return np.full(len(prices), np.nan)
         
-        df = pd.DataFrame({'price': prices})
-        sma = df['price'].rolling(window=period).mean()
-        return sma.tolist()
+        return _rolling_mean(np.asarray(prices, dtype=np.float64), period)
     
     @staticmethod
-    def calculate_ema(prices: List[float], period: int) -> List[float]:
+    def calculate_ema(prices: List[float], period: int) -> np.ndarray:
         """Calculate Exponential Moving Average"""
         if len(prices) < period:
-            return [None] * len(prices)
+            return np.full(len(prices), np.nan)
         
-        df = pd.DataFrame({'price': prices})
-        ema = df['price'].ewm(span=period, adjust=False).mean()
-        return ema.tolist()
+        return _ewm(np.asarray(prices, dtype=np.float64), 2.0 / (period + 1))
     
     @staticmethod
-    def calculate_rsi(prices: List[float], period: int = 14) -> List[float]:
+    def calculate_rsi(prices: List[float], period: int = 14) -> np.ndarray:
         """Calculate Relative Strength Index"""
         if len(prices) < period + 1:
-            return [None] * len(prices)
+            return np.full(len(prices), np.nan)
+        
+        arr = np.asarray(prices, dtype=np.float64)
         
-        df = pd.DataFrame({'price': prices})
-        delta = df['price'].diff()
+        # A NaN change counts as no move, as delta.where(...) fills it with 0
+        delta = np.zeros(arr.size)
+        np.subtract(arr[1:], arr[:-1], out=delta[1:])
+        up = delta > 0
+        down = delta < 0
+        gain = _rolling_mean(np.where(up, delta, 0.0), period)
+        loss = _rolling_mean(np.where(down, -delta, 0.0), period)
         
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+        # Windows without a move in one direction average exactly 0, not cumsum residue
+        gain[period - 1:][_window_sums(up.astype(np.float64), period)[0] == 0] = 0.0
+        loss[period - 1:][_window_sums(down.astype(np.float64), period)[0] == 0] = 0.0
         
-        rs = gain / loss
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
         
-        return rsi.tolist()
+        return rsi
     
     @staticmethod
     def calculate_macd(prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Dict:
         """Calculate MACD (Moving Average Convergence Divergence)"""
         if len(prices) < slow:
             return {
-                "macd": [None] * len(prices),
-                "signal": [None] * len(prices),
-                "histogram": [None] * len(prices)
+                "macd": np.full(len(prices), np.nan),
+                "signal": np.full(len(prices), np.nan),
+                "histogram": np.full(len(prices), np.nan)
             }
         
-        df = pd.DataFrame({'price': prices})
+        arr = np.asarray(prices, dtype=np.float64)
         
-        ema_fast = df['price'].ewm(span=fast, adjust=False).mean()
-        ema_slow = df['price'].ewm(span=slow, adjust=False).mean()
+        ema_fast = _ewm(arr, 2.0 / (fast + 1))
+        ema_slow = _ewm(arr, 2.0 / (slow + 1))
         
         macd = ema_fast - ema_slow
-        signal_line = macd.ewm(span=signal, adjust=False).mean()
+        signal_line = _ewm(macd, 2.0 / (signal + 1))
         histogram = macd - signal_line
         
         return {
-            "macd": macd.tolist(),
-            "signal": signal_line.tolist(),
-            "histogram": histogram.tolist()
+            "macd": macd,
+            "signal": signal_line,
+            "histogram": histogram
         }
     
     @staticmethod
@@ -77,138 +434,205 @@ class TechnicalIndicators:
         """Calculate Bollinger Bands"""
         if len(prices) < period:
             return {
-                "upper": [None] * len(prices),
-                "middle": [None] * len(prices),
-                "lower": [None] * len(prices)
+                "upper": np.full(len(prices), np.nan),
+                "middle": np.full(len(prices), np.nan),
+                "lower": np.full(len(prices), np.nan)
             }
         
-        df = pd.DataFrame({'price': prices})
+        arr = np.asarray(prices, dtype=np.float64)
         
-        middle = df['price'].rolling(window=period).mean()
-        std = df['price'].rolling(window=period).std()
+        # Centre on the series mean first so the sum of squares doesn't cancel catastrophically
+        finite = arr[np.isfinite(arr)]
+        shift = finite.mean() if finite.size else 0.0
+        centered = arr - shift
+        sums, counts = _window_sums(centered, period)
+        sq_sums, _ = _window_sums(centered * centered, period)
+        
+        # Sample standard deviation (ddof=1), as rolling().std()
+        window_mean = sums / period
+        if period > 1:
+            window_std = np.sqrt(np.maximum((sq_sums - sums * window_mean) / (period - 1), 0.0))
+            # Flat windows are exactly 0, not cumsum rounding noise (pandas special-cases them too)
+            changes = np.zeros(arr.size, dtype=np.int64)
+            np.cumsum(arr[1:] != arr[:-1], out=changes[1:])
+            window_std[changes[period - 1:] == changes[:arr.size - period + 1]] = 0.0
+        else:
+            window_std = np.full(sums.size, np.nan)
+        full = counts == period
+        
+        middle = np.full(arr.size, np.nan)
+        middle[period - 1:] = np.where(full, window_mean + shift, np.nan)
+        std = np.full(arr.size, np.nan)
+        std[period - 1:] = np.where(full, window_std, np.nan)
         
         upper = middle + (std * std_dev)
         lower = middle - (std * std_dev)
         
         return {
-            "upper": upper.tolist(),
-            "middle": middle.tolist(),
-            "lower": lower.tolist()
+            "upper": upper,
+            "middle": middle,
+            "lower": lower
         }
     
     @staticmethod
-    def calculate_atr(high: List[float], low: List[float], close: List[float], period: int = 14) -> List[float]:
+    def calculate_atr(high: List[float], low: List[float], close: List[float], period: int = 14) -> np.ndarray:
         """Calculate Average True Range"""
         if len(high) < period + 1:
-            return [None] * len(high)
+            return np.full(len(high), np.nan)
         
-        df = pd.DataFrame({
-            'high': high,
-            'low': low,
-            'close': close
-        })
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
         
-        df['h-l'] = df['high'] - df['low']
-        df['h-pc'] = abs(df['high'] - df['close'].shift(1))
-        df['l-pc'] = abs(df['low'] - df['close'].shift(1))
+        # Previous close; the first bar has none, so only its high-low range counts
+        prev_close = np.empty_like(close)
+        prev_close[0] = np.nan
+        prev_close[1:] = close[:-1]
         
-        df['tr'] = df[['h-l', 'h-pc', 'l-pc']].max(axis=1)
-        atr = df['tr'].rolling(window=period).mean()
+        # fmax skips NaN legs, as DataFrame.max(axis=1) does
+        tr = high - low
+        np.fmax(tr, np.abs(high - prev_close), out=tr)
+        np.fmax(tr, np.abs(low - prev_close), out=tr)
         
-        return atr.tolist()
+        return _rolling_mean(tr, period)
     
     @staticmethod
     def calculate_stochastic(high: List[float], low: List[float], close: List[float], period: int = 14) -> Dict:
         """Calculate Stochastic Oscillator"""
         if len(high) < period:
             return {
-                "k": [None] * len(high),
-                "d": [None] * len(high)
+                "k": np.full(len(high), np.nan),
+                "d": np.full(len(high), np.nan)
             }
         
-        df = pd.DataFrame({
-            'high': high,
-            'low': low,
-            'close': close
-        })
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
         
-        low_min = df['low'].rolling(window=period).min()
-        high_max = df['high'].rolling(window=period).max()
+        if HAS_NUMBA:
+            low_min = np.empty(low.size)
+            high_max = np.empty(high.size)
+            _rolling_min_max(low, high, period, low_min, high_max)
+        else:
+            # Zero-copy (n - period + 1, period) window views, reduced in C; NaN propagates as in rolling()
+            low_min = np.full(low.size, np.nan)
+            low_min[period - 1:] = sliding_window_view(low, period).min(axis=-1)
+            high_max = np.full(high.size, np.nan)
+            high_max[period - 1:] = sliding_window_view(high, period).max(axis=-1)
         
-        k = 100 * ((df['close'] - low_min) / (high_max - low_min))
-        d = k.rolling(window=3).mean()
+        # A flat window divides by zero; like the fused kernel, leave it NaN (null in the response)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = 100 * ((np.asarray(close, dtype=np.float64) - low_min) / (high_max - low_min))
+        k[np.isinf(k)] = np.nan
+        d = _rolling_mean(k, 3)
+        
+        return {
+            "k": k,
+            "d": d
+        }
+    
+    @staticmethod
+    def _calculate_rolling_fused(high: List[float], low: List[float], close: List[float]) -> Dict:
+        """SMA, RSI, Bollinger, ATR and Stochastic from a single pass of the fused kernel"""
+        close = np.asarray(close, dtype=np.float64)
+        # One C-contiguous block per call; its rows become the returned series without copying
+        rows = np.empty((_N_ROWS, close.size), dtype=OUTPUT_DTYPE)
+        _compute_all(np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64), close, rows)
         
         return {
-            "k": k.tolist(),
-            "d": d.tolist()
+            "sma_20": rows[_SMA_20],
+            "sma_50": rows[_SMA_50],
+            "sma_200": rows[_SMA_200],
+            "rsi": rows[_RSI],
+            "bollinger": {
+                "upper": rows[_BB_UPPER],
+                "middle": rows[_BB_MIDDLE],
+                "lower": rows[_BB_LOWER]
+            },
+            "atr": rows[_ATR],
+            "stochastic": {
+                "k": rows[_STOCH_K],
+                "d": rows[_STOCH_D]
+            }
         }
     
     @staticmethod
-    def calculate_all_indicators(historical_data: Dict) -> Dict:
+    def calculate_all_indicators(ohlcv: Union[OHLCV, Mapping]) -> Mapping:
         """
         Calculate all technical indicators from historical data
         
         Args:
-            historical_data: Dictionary with OHLCV data
+            ohlcv: OHLCV series (a dictionary of lists is converted first)
             
         Returns:
-            Dictionary with all calculated indicators
+            Read-only mapping with all calculated indicators (shared with later calls
+            for the same prices)
         """
         try:
-            close_prices = historical_data['close']
-            high_prices = historical_data['high']
-            low_prices = historical_data['low']
+            if not isinstance(ohlcv, OHLCV):
+                ohlcv = OHLCV.from_dict(ohlcv)
+            # Every indicator below works on these float64 arrays as-is
+            high, low, close = ohlcv.high, ohlcv.low, ohlcv.close
             
-            indicators = {
-                "sma_20": TechnicalIndicators.calculate_sma(close_prices, 20),
-                "sma_50": TechnicalIndicators.calculate_sma(close_prices, 50),
-                "sma_200": TechnicalIndicators.calculate_sma(close_prices, 200),
-                "ema_12": TechnicalIndicators.calculate_ema(close_prices, 12),
-                "ema_26": TechnicalIndicators.calculate_ema(close_prices, 26),
-                "rsi": TechnicalIndicators.calculate_rsi(close_prices, 14),
-                "macd": TechnicalIndicators.calculate_macd(close_prices),
-                "bollinger": TechnicalIndicators.calculate_bollinger_bands(close_prices),
-                "atr": TechnicalIndicators.calculate_atr(high_prices, low_prices, close_prices),
-                "stochastic": TechnicalIndicators.calculate_stochastic(high_prices, low_prices, close_prices)
-            }
-            
-            # Get latest values for analysis
-            latest = {
-                "rsi_current": indicators["rsi"][-1] if indicators["rsi"][-1] is not None else 0,
-                "macd_current": indicators["macd"]["macd"][-1] if indicators["macd"]["macd"][-1] is not None else 0,
-                "macd_signal": indicators["macd"]["signal"][-1] if indicators["macd"]["signal"][-1] is not None else 0,
-                "price_vs_sma20": ((close_prices[-1] / indicators["sma_20"][-1]) - 1) * 100 if indicators["sma_20"][-1] else 0,
-                "price_vs_sma50": ((close_prices[-1] / indicators["sma_50"][-1]) - 1) * 100 if indicators["sma_50"][-1] else 0,
-                "price_vs_sma200": ((close_prices[-1] / indicators["sma_200"][-1]) - 1) * 100 if indicators["sma_200"][-1] else 0,
-            }
+            # The indicators are a pure function of the prices, so repeat requests reuse them
+            key = _series_key(high, low, close)
+            with _memo_lock:
+                indicators = _memo.get(key)
+                if indicators is not None:
+                    _memo.move_to_end(key)
+                    return indicators
             
-            indicators["latest"] = latest
+            indicators = TechnicalIndicators._calculate_all_arr(high, low, close)
             
-            # Sanitize indicators (replace NaN with None)
-            def sanitize_value(v):
-                if isinstance(v, (float, np.float64, np.float32)):
-                    if np.isnan(v) or np.isinf(v):
-                        return None
-                return v
-
-            # Recursively sanitize dictionary
-            def sanitize_dict(d):
-                clean = {}
-                for k, v in d.items():
-                    if isinstance(v, dict):
-                        clean[k] = sanitize_dict(v)
-                    elif isinstance(v, list):
-                        clean[k] = [sanitize_value(i) for i in v]
-                    else:
-                        clean[k] = sanitize_value(v)
-                return clean
-
-            indicators = sanitize_dict(indicators)
+            with _memo_lock:
+                _memo[key] = indicators
+                while len(_memo) > INDICATOR_MEMO_SIZE:
+                    _memo.popitem(last=False)
             return indicators
             
         except Exception as e:
             logger.error(f"Error calculating indicators: {str(e)}")
             return {}
+    
+    @staticmethod
+    def _calculate_all_arr(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Mapping:
+        """calculate_all_indicators on float64 price arrays"""
+        if HAS_NUMBA:
+            indicators = TechnicalIndicators._calculate_rolling_fused(high, low, close)
+        else:
+            indicators = {
+                "sma_20": TechnicalIndicators.calculate_sma(close, 20),
+                "sma_50": TechnicalIndicators.calculate_sma(close, 50),
+                "sma_200": TechnicalIndicators.calculate_sma(close, 200),
+                "rsi": TechnicalIndicators.calculate_rsi(close, 14),
+                "bollinger": TechnicalIndicators.calculate_bollinger_bands(close),
+                "atr": TechnicalIndicators.calculate_atr(high, low, close),
+                "stochastic": TechnicalIndicators.calculate_stochastic(high, low, close)
+            }
+        indicators["ema_12"] = TechnicalIndicators.calculate_ema(close, 12)
+        indicators["ema_26"] = TechnicalIndicators.calculate_ema(close, 26)
+        indicators["macd"] = TechnicalIndicators.calculate_macd(close)
+        indicators = _as_output(indicators)
+        
+        # Get latest values for analysis
+        # Missing readings (NaN during warm-up or for a too-short series) count as 0
+        rsi, macd, macd_signal, sma_20, sma_50, sma_200 = (
+            _last_reading(values) for values in (
+                indicators["rsi"], indicators["macd"]["macd"], indicators["macd"]["signal"],
+                indicators["sma_20"], indicators["sma_50"], indicators["sma_200"],
+            )
+        )
+        last_close = float(close[-1])
+        latest = {
+            "rsi_current": rsi,
+            "macd_current": macd,
+            "macd_signal": macd_signal,
+            "price_vs_sma20": ((last_close / sma_20) - 1) * 100 if sma_20 else 0,
+            "price_vs_sma50": ((last_close / sma_50) - 1) * 100 if sma_50 else 0,
+            "price_vs_sma200": ((last_close / sma_200) - 1) * 100 if sma_200 else 0,
+        }
+        
+        indicators["latest"] = MappingProxyType(latest)
+        return MappingProxyType(indicators)
 
 
 # Singleton instance
@@ -5,21 +5,27 @@ Stock Predictor API - Root Level
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, List, Mapping, Optional
+import asyncio
 import logging
 import os
+import time
+import orjson
 from dotenv import load_dotenv
 
-from fastapi.encoders import jsonable_encoder
-import numpy as np
-import math
+# Numba's compiled-kernel cache, shared by every worker; RAM-backed where /dev/shm exists.
+# Must be set before the services below import numba.
+if os.path.isdir('/dev/shm'):
+    os.environ.setdefault('NUMBA_CACHE_DIR', '/dev/shm/numba_cache')
+if os.environ.get('NUMBA_CACHE_DIR'):
+    os.makedirs(os.environ['NUMBA_CACHE_DIR'], exist_ok=True)
 
 from backend.services.symbol_registry import get_registry
 from backend.services.fundamentals_fetcher import get_fetcher
 from backend.services.technical_indicators import get_indicators
-from backend.services.news_sentiment_engine import get_news_engine
+from backend.services.news_sentiment_engine import get_news_engine, close_news_engine
 from backend.services.prediction_engine import get_predictor
 from backend.services.ai_summary_generator import get_summary_generator
 from backend.services.data_cache_manager import get_cache
@@ -61,6 +67,26 @@ if os.path.exists(FRONTEND_DIR):
 else:
     logger.warning(f"Frontend directory not found: {FRONTEND_DIR}")
 
+def _orjson_default(obj):
+    """Types orjson doesn't serialize natively (read-only demo mappings)"""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError
+
+class AnalysisJSONResponse(ORJSONResponse):
+    """
+    JSON response for NumPy-heavy payloads
+    
+    orjson writes NaN/Inf (Python or NumPy) as null and serializes NumPy scalars and
+    arrays itself, so the payload needs no sanitizing walk first.
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            default=_orjson_default
+        )
+
 # Pydantic models
 class SearchResponse(BaseModel):
     symbol: str
@@ -75,6 +101,11 @@ class StockAnalysisResponse(BaseModel):
     prediction: dict
     ai_summary: dict
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled outbound connections"""
+    await close_news_engine()
+
 # Routes
 @app.get("/")
 async def root():
@@ -124,7 +155,7 @@ async def get_market_summary():
         news_engine = get_news_engine()
         
         # Get indices data
-        indices = fetcher.get_market_indices()
+        indices = await fetcher.get_market_indices_async()
         
         # Get market news
         news = news_engine.get_market_news(limit=10)
@@ -145,9 +176,17 @@ async def get_stock_analysis(symbol: str):
     Args:
         symbol: Stock symbol (e.g., RELIANCE.NS)
     """
+    # Per-stage timings, logged once per request instead of a line per step
+    laps = []
+    last = time.perf_counter_ns()
+    
+    def lap(stage: str):
+        nonlocal last
+        now = time.perf_counter_ns()
+        laps.append((stage, (now - last) / 1e6))
+        last = now
+    
     try:
-        logger.info(f"Analyzing stock: {symbol}")
-        
         # Initialize services
         fetcher = get_fetcher()
         indicators_service = get_indicators()
@@ -155,41 +194,46 @@ async def get_stock_analysis(symbol: str):
         predictor = get_predictor()
         summary_generator = get_summary_generator()
         
-        # Get fundamentals
-        logger.info(f"Fetching fundamentals for {symbol}")
-        fundamentals = fetcher.get_fundamentals(symbol)
-        logger.info(f"Fundamentals result: {fundamentals is not None}")
+        # Get fundamentals (blocking fetches run on worker threads, off the event loop)
+        fundamentals = await asyncio.to_thread(fetcher.get_fundamentals, symbol)
+        lap("fundamentals")
         
         if not fundamentals:
-            logger.error(f"Fundamentals returned None for {symbol}")
+            logger.error("Fundamentals returned None for %s", symbol)
             raise HTTPException(status_code=404, detail=f"Stock not found: {symbol}. Try RELIANCE.NS, TCS.NS, or HDFCBANK.NS for demo data.")
         
+        # Company news only needs the name, so it runs alongside everything below
+        news_task = asyncio.create_task(
+            news_engine.get_company_news_async(
+                fundamentals['name'],
+                symbol,
+                limit=5
+            )
+        )
+        
         # Get historical data
-        logger.info(f"Fetching historical data for {symbol}")
-        historical_data = fetcher.get_historical_data(symbol, period="1y")
-        logger.info(f"Historical data result: {historical_data is not None}")
+        historical_data = await asyncio.to_thread(fetcher.get_historical_data, symbol, period="1y")
+        lap("history")
         
         if not historical_data:
-            logger.error(f"Historical data returned None for {symbol}")
+            news_task.cancel()
+            logger.error("Historical data returned None for %s", symbol)
             raise HTTPException(status_code=404, detail="Historical data not available")
         
-        # Calculate technical indicators
-        technical_indicators = indicators_service.calculate_all_indicators(historical_data)
-        
-        # Get news and sentiment
-        company_news = news_engine.get_company_news(
-            fundamentals['name'],
-            symbol,
-            limit=5
-        )
-        sentiment = news_engine.calculate_overall_sentiment(company_news)
+        # Calculate technical indicators on a worker thread, keeping the event loop free
+        technical_indicators = await asyncio.to_thread(indicators_service.calculate_all_indicators, historical_data)
+        lap("indicators")
         
-        # Get price prediction
-        prediction = predictor.get_prediction_with_backtest(
+        # Price prediction, while the news request is still in flight
+        prediction = await predictor.predict_async(
             historical_data,
             technical_indicators,
             days=7
         )
+        lap("prediction")
+        company_news = await news_task
+        lap("news_wait")
+        sentiment = news_engine.calculate_overall_sentiment(company_news)
         
         # Generate AI summary
         ai_summary = summary_generator.generate_complete_summary(
@@ -199,10 +243,17 @@ async def get_stock_analysis(symbol: str):
             company_news,
             prediction
         )
+        lap("summary")
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Analyzed %s in %.1f ms (%s)", symbol, sum(ms for _, ms in laps),
+                " ".join(f"{stage}={ms:.1f}ms" for stage, ms in laps)
+            )
         
         response_data = {
             "fundamentals": fundamentals,
-            "historical_data": historical_data,
+            "historical_data": historical_data.to_dict(),
             "technical_indicators": technical_indicators,
             "news": company_news,
             "sentiment": sentiment,
@@ -210,29 +261,37 @@ async def get_stock_analysis(symbol: str):
             "ai_summary": ai_summary
         }
         
-        # Sanitize whole response to remove NaN/Inf values
-        def sanitize_json(obj):
-            if isinstance(obj, float):
-                if math.isnan(obj) or math.isinf(obj):
-                    return None
-            if isinstance(obj, dict):
-                return {k: sanitize_json(v) for k, v in obj.items()}
-            if isinstance(obj, list):
-                return [sanitize_json(i) for i in obj]
-            if isinstance(obj, (np.int64, np.int32)):
-                return int(obj)
-            if isinstance(obj, (np.float64, np.float32)):
-                if np.isnan(obj) or np.isinf(obj):
-                    return None
-                return float(obj)
-            return obj
-            
-        return sanitize_json(response_data)
+        # NaN/Inf become null as the response is serialized
+        return AnalysisJSONResponse(response_data)
          
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Stock analysis error: {str(e)}")
+        logger.error("Stock analysis error for %s: %s", symbol, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/news/batch")
+async def get_news_batch(symbols: str, limit: int = 5):
+    """
+    Get company news with sentiment for a whole watchlist
+    
+    Args:
+        symbols: Comma-separated stock symbols
+        limit: Maximum number of articles per symbol
+    """
+    try:
+        registry = get_registry()
+        news_engine = get_news_engine()
+        
+        pairs = []
+        for symbol in filter(None, (s.strip() for s in symbols.split(','))):
+            info = registry.get_symbol(symbol)
+            name = info["name"] if info else symbol.split('.')[0]
+            pairs.append((name, symbol))
+        
+        return await news_engine.get_company_news_many(pairs, limit=limit)
+    except Exception as e:
+        logger.error(f"News batch error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/cache/clear")
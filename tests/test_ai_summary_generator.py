@@ -0,0 +1,192 @@
+"""
+Tests for the verdict rules table and summary bands against the original if/elif cascade
+"""
+import itertools
+import math
+import unittest
+
+from backend.services.ai_summary_generator import AISummaryGenerator
+
+NAN = math.nan
+
+
+def cascade_verdict(fundamentals, indicators, sentiment, prediction):
+    """Score and reasons exactly as the original if/elif cascade computed them"""
+    score = 0
+    reasons = []
+
+    latest = indicators.get('latest', {})
+    rsi = latest.get('rsi_current', 50)
+    macd = latest.get('macd_current', 0)
+    macd_signal = latest.get('macd_signal', 0)
+    price_vs_sma20 = latest.get('price_vs_sma20', 0)
+
+    if rsi < 30:
+        score += 15
+        reasons.append("Oversold RSI suggests buying opportunity")
+    elif rsi > 70:
+        score -= 15
+        reasons.append("Overbought RSI suggests caution")
+
+    if macd > macd_signal:
+        score += 10
+        reasons.append("Bullish MACD crossover")
+    else:
+        score -= 10
+        reasons.append("Bearish MACD signal")
+
+    if price_vs_sma20 > 0:
+        score += 15
+        reasons.append("Price above 20-day moving average")
+    else:
+        score -= 15
+        reasons.append("Price below 20-day moving average")
+
+    pe_ratio = fundamentals.get('pe_ratio', 0)
+    roe = fundamentals.get('roe', 0)
+    revenue_growth = fundamentals.get('revenue_growth', 0)
+
+    if 0 < pe_ratio < 20:
+        score += 10
+        reasons.append("Attractive valuation")
+    elif pe_ratio > 40:
+        score -= 10
+        reasons.append("High valuation concerns")
+
+    if roe > 15:
+        score += 10
+        reasons.append("Strong return on equity")
+
+    if revenue_growth > 10:
+        score += 10
+        reasons.append("Strong revenue growth")
+    elif revenue_growth < 0:
+        score -= 10
+        reasons.append("Declining revenues")
+
+    sentiment_label = sentiment.get('label', 'neutral')
+    if sentiment_label == 'positive':
+        score += 15
+        reasons.append("Positive news sentiment")
+    elif sentiment_label == 'negative':
+        score -= 15
+        reasons.append("Negative news sentiment")
+
+    trend = prediction.get('trend', 'neutral')
+    change_percent = prediction.get('change_percent', 0)
+    if trend == 'upward' and change_percent > 5:
+        score += 15
+        reasons.append("AI predicts significant upside")
+    elif trend == 'downward' and change_percent < -5:
+        score -= 15
+        reasons.append("AI predicts significant downside")
+
+    return score, reasons[:5]
+
+
+def cascade_rsi_sentence(rsi):
+    if rsi > 70:
+        return f"RSI at {rsi:.1f} indicates overbought conditions, suggesting potential downward pressure."
+    elif rsi < 30:
+        return f"RSI at {rsi:.1f} indicates oversold conditions, suggesting potential upward reversal."
+    return f"RSI at {rsi:.1f} is in neutral territory."
+
+
+# Values on, either side of, and between every threshold, plus NaN
+RSI_VALUES = (10.0, 29.9, 30.0, 50.0, 70.0, 70.1, NAN)
+MACD_PAIRS = ((1.0, 0.5), (0.5, 1.0), (0.5, 0.5), (NAN, 0.5))
+SMA20_VALUES = (-3.0, 0.0, 2.0)
+PE_VALUES = (-5.0, 0.0, 12.0, 20.0, 30.0, 40.0, 55.0)
+ROE_VALUES = (15.0, 22.0)
+GROWTH_VALUES = (-4.0, 0.0, 10.0, 18.0)
+LABELS = ('positive', 'neutral', 'negative')
+PREDICTIONS = (('upward', 8.0), ('upward', 5.0), ('downward', -8.0), ('downward', -5.0), ('neutral', 0.0))
+
+
+def signal_grid():
+    for rsi, (macd, macd_signal), sma20, pe, roe, growth, label, (trend, change) in itertools.product(
+        RSI_VALUES, MACD_PAIRS, SMA20_VALUES, PE_VALUES, ROE_VALUES, GROWTH_VALUES, LABELS, PREDICTIONS
+    ):
+        yield (
+            {'pe_ratio': pe, 'roe': roe, 'revenue_growth': growth},
+            {'latest': {'rsi_current': rsi, 'macd_current': macd, 'macd_signal': macd_signal, 'price_vs_sma20': sma20}},
+            {'label': label},
+            {'trend': trend, 'change_percent': change},
+        )
+
+
+class VerdictRulesTest(unittest.TestCase):
+    def test_rules_match_cascade(self):
+        for inputs in signal_grid():
+            result = AISummaryGenerator.generate_verdict(*inputs)
+            score, reasons = cascade_verdict(*inputs)
+            self.assertEqual((result["score"], result["reasons"]), (score, reasons), inputs)
+
+    def test_missing_inputs_match_cascade(self):
+        inputs = ({}, {}, {}, {})
+        result = AISummaryGenerator.generate_verdict(*inputs)
+        self.assertEqual((result["score"], result["reasons"]), cascade_verdict(*inputs))
+        self.assertEqual(result["verdict"], "HOLD")
+
+    def test_verdict_thresholds(self):
+        strong_buy = (
+            {'pe_ratio': 12.0, 'roe': 22.0, 'revenue_growth': 18.0},
+            {'latest': {'rsi_current': 20.0, 'macd_current': 1.0, 'macd_signal': 0.5, 'price_vs_sma20': 2.0}},
+            {'label': 'positive'},
+            {'trend': 'upward', 'change_percent': 8.0},
+        )
+        result = AISummaryGenerator.generate_verdict(*strong_buy)
+        self.assertEqual((result["verdict"], result["score"], result["confidence"]), ("BUY", 100, 95))
+
+
+class VerdictsBatchTest(unittest.TestCase):
+    def setUp(self):
+        # Every 7th grid point keeps the batch small while still crossing every threshold
+        self.rows = list(itertools.islice(signal_grid(), 0, None, 7))
+        fundamentals, indicators, sentiment, prediction = zip(*self.rows)
+        latest = [row['latest'] for row in indicators]
+        self.columns = (
+            {key: [row[key] for row in fundamentals] for key in ('pe_ratio', 'roe', 'revenue_growth')},
+            {key: [row[key] for row in latest] for key in ('rsi_current', 'macd_current', 'macd_signal', 'price_vs_sma20')},
+            {'label': [row['label'] for row in sentiment]},
+            {key: [row[key] for row in prediction] for key in ('trend', 'change_percent')},
+        )
+
+    def test_batch_matches_per_row_verdicts(self):
+        results = AISummaryGenerator.generate_verdicts_batch(*self.columns)
+
+        self.assertEqual(len(results), len(self.rows))
+        for result in results:
+            result = dict(result)
+            expected = AISummaryGenerator.generate_verdict(*self.rows[result.pop("index")])
+            self.assertEqual(result, expected)
+
+        scores = [result["score"] for result in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_top_k(self):
+        results = AISummaryGenerator.generate_verdicts_batch(*self.columns)
+        top = AISummaryGenerator.generate_verdicts_batch(*self.columns, top_k=5)
+
+        self.assertEqual(top, results[:5])
+
+
+class RsiBandsTest(unittest.TestCase):
+    def test_technical_summary_bands_match_cascade(self):
+        for rsi in RSI_VALUES + (0.0, 100.0):
+            summary = AISummaryGenerator.generate_technical_summary({'latest': {'rsi_current': rsi}}, {})
+            self.assertTrue(summary.startswith(cascade_rsi_sentence(rsi)), rsi)
+
+    def test_missing_rsi_defaults(self):
+        # The summary always read a missing RSI as 0, the verdict as a neutral 50
+        for indicators in ({}, {'latest': {}}):
+            summary = AISummaryGenerator.generate_technical_summary(indicators, {})
+            self.assertTrue(summary.startswith(cascade_rsi_sentence(0)), summary)
+
+            complete = AISummaryGenerator.generate_complete_summary({}, indicators, {}, [], {})
+            self.assertEqual(complete["technical_summary"], summary)
+            self.assertNotIn("Oversold RSI suggests buying opportunity", complete["verdict"]["reasons"])
+
+
+if __name__ == "__main__":
+    unittest.main()
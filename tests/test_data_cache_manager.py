@@ -0,0 +1,76 @@
+"""
+Tests for the SQLite-backed cache manager
+"""
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from backend.services import data_cache_manager
+from backend.services.data_cache_manager import DataCacheManager
+
+
+class DataCacheManagerTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = DataCacheManager(db_path=os.path.join(self._tmp.name, "cache.db"), gc_interval=0)
+
+    def tearDown(self):
+        self.cache._conn.close()
+        self._tmp.cleanup()
+
+    def test_get_returns_stored_value(self):
+        value = {"close": [1.5, 2.5], "volume": [100, 200], "name": "TCS"}
+        self.cache.set("historical:TCS.NS:1y", value, category="historical")
+
+        # First get reads from SQLite, the second is served from memory
+        self.assertEqual(self.cache.get("historical:TCS.NS:1y"), value)
+        self.assertEqual(self.cache.get("historical:TCS.NS:1y"), value)
+
+    def test_mutating_result_does_not_change_cache(self):
+        self.cache.set("fundamentals:TCS.NS", {"name": "TCS", "tags": ["it"]}, category="fundamentals")
+
+        for _ in range(2):
+            result = self.cache.get("fundamentals:TCS.NS")
+            result["name"] = "changed"
+            result["tags"].append("changed")
+            result["extra"] = True
+
+        self.assertEqual(self.cache.get("fundamentals:TCS.NS"), {"name": "TCS", "tags": ["it"]})
+
+    def test_large_values_round_trip(self):
+        value = {"close": [float(i) for i in range(5000)]}
+        self.cache.set("historical:BIG:1y", value, category="historical")
+
+        self.assertEqual(self.cache.get("historical:BIG:1y"), value)
+        self.assertEqual(self.cache.get("historical:BIG:1y"), value)
+
+    def test_missing_and_expired_keys(self):
+        self.cache.set("news:stale", ["article"], category="news", ttl=-1)
+
+        self.assertIsNone(self.cache.get("news:missing"))
+        self.assertIsNone(self.cache.get("news:stale"))
+
+    def test_set_during_read_is_not_shadowed(self):
+        self.cache.set("fundamentals:TCS.NS", {"cmp": 1}, category="fundamentals")
+        decompress = data_cache_manager._decompress
+        writer = threading.Thread(
+            target=self.cache.set, args=("fundamentals:TCS.NS", {"cmp": 2}), kwargs={"category": "fundamentals"}
+        )
+
+        def racing_decompress(payload):
+            # A writer arrives while this get() is between its SQLite read and its memory refill
+            writer.start()
+            writer.join(timeout=0.2)
+            return decompress(payload)
+
+        with mock.patch.object(data_cache_manager, "_decompress", racing_decompress):
+            self.assertEqual(self.cache.get("fundamentals:TCS.NS"), {"cmp": 1})
+        writer.join()
+
+        self.assertEqual(self.cache.get("fundamentals:TCS.NS"), {"cmp": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
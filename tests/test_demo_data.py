@@ -0,0 +1,53 @@
+"""
+Tests for the generated demo data
+"""
+import unittest
+
+import numpy as np
+
+from backend.services import demo_data
+from backend.services.demo_data import generate_demo_historical_data
+from backend.services.ohlcv import OHLCV
+
+
+class DemoHistoryTest(unittest.TestCase):
+    def test_history_is_immutable(self):
+        history = generate_demo_historical_data("TCS.NS")
+
+        with self.assertRaises(ValueError):
+            history["close"][0] = 0.0
+        with self.assertRaises(AttributeError):
+            history["dates"].append("2099-01-01")
+        with self.assertRaises(TypeError):
+            history["close"] = []
+
+        self.assertIs(generate_demo_historical_data("TCS.NS"), history)
+
+    def test_history_shape(self):
+        history = generate_demo_historical_data("TCS.NS", days=30)
+        ohlcv = OHLCV.from_dict(history)
+
+        self.assertEqual(len(history["dates"]), 30)
+        self.assertEqual(ohlcv.volume.dtype, np.int64)
+        self.assertTrue(np.all(ohlcv.high >= ohlcv.low))
+
+
+@unittest.skipUnless(demo_data.HAS_NUMBA, "numba not installed")
+class CandleKernelParityTest(unittest.TestCase):
+    def test_numba_matches_numpy(self):
+        for seed, days in ((1, 1), (7, 2), (12345, 252), (2 ** 31, 1000)):
+            draws = demo_data._hist_draws(seed, days)
+            native = demo_data._candles(*draws, 3750.5, 2500000.0)
+            reference = demo_data._candles_numpy(*draws, 3750.5, 2500000.0)
+
+            for got, expected in zip(native[:4], reference[:4]):
+                np.testing.assert_allclose(got, expected, rtol=1e-12)
+            np.testing.assert_array_equal(native[4], reference[4])
+
+    def test_draws_are_deterministic(self):
+        for got, expected in zip(demo_data._hist_draws(42, 50), demo_data._hist_draws(42, 50)):
+            np.testing.assert_array_equal(got, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+"""
+Tests for the fundamentals fetcher's cache and fallback paths (no network access)
+"""
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+from backend.services import fundamentals_fetcher
+from backend.services.data_cache_manager import DataCacheManager
+from backend.services.fundamentals_fetcher import FundamentalsFetcher
+
+HISTORY = {
+    "dates": ["2024-01-01", "2024-01-02", "2024-01-03"],
+    "open": [100.0, 101.0, 102.0],
+    "high": [105.0, 106.0, 107.0],
+    "low": [95.0, 96.0, 97.0],
+    "close": [101.0, 102.0, 103.0],
+    "volume": [1000, 2000, 3000],
+}
+
+
+class FailingTicker:
+    """yfinance Ticker whose .info request always fails"""
+    def __init__(self, symbol, session=None):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        raise Exception("rate limited")
+
+
+class InfoTicker:
+    """yfinance Ticker with a full .info payload"""
+    def __init__(self, symbol, session=None):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        return {
+            "longName": "Tata Consultancy Services",
+            "currentPrice": 103.0,
+            "previousClose": 102.0,
+            "trailingPE": 30.0,
+            "fiftyTwoWeekHigh": 500.0,
+            "fiftyTwoWeekLow": 50.0,
+            "fiftyDayAverage": 300.0,
+            "twoHundredDayAverage": 250.0,
+        }
+
+
+class FakeYFinance:
+    def __init__(self, ticker_cls=FailingTicker):
+        self.ticker_cls = ticker_cls
+        self.ticker_calls = 0
+
+    def Ticker(self, symbol, session=None):
+        self.ticker_calls += 1
+        return self.ticker_cls(symbol, session=session)
+
+
+class FetcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = DataCacheManager(db_path=os.path.join(self._tmp.name, "cache.db"), gc_interval=0)
+        with mock.patch.object(fundamentals_fetcher, "get_cache", return_value=self.cache):
+            self.fetcher = FundamentalsFetcher()
+        self.yf = FakeYFinance()
+        self.fetcher._yf = self.yf
+
+    def tearDown(self):
+        self.cache._conn.close()
+        self._tmp.cleanup()
+
+
+class DemoFallbackTest(FetcherTestCase):
+    def test_negative_cache_matches_first_failure(self):
+        self.cache.set("historical:TCS.NS:1y", HISTORY, category="historical")
+
+        first = self.fetcher.get_fundamentals("TCS.NS")
+        # The short-lived demo entry expires while the negative marker is still alive
+        self.cache.delete("fundamentals:TCS.NS")
+        second = self.fetcher.get_fundamentals("TCS.NS")
+
+        self.assertEqual(self.yf.ticker_calls, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(second["52_week_high"], 107.0)
+        self.assertEqual(second["52_week_low"], 95.0)
+        self.assertEqual(second["50_day_avg"], 102.0)
+
+    def test_demo_fallback_without_history(self):
+        fundamentals = self.fetcher.get_fundamentals("TCS.NS")
+
+        self.assertEqual(fundamentals["symbol"], "TCS.NS")
+        self.assertEqual(fundamentals["52_week_high"], 4045.0)
+
+
+class HistoryFieldsTest(FetcherTestCase):
+    def test_cached_history_replaces_info_ranges(self):
+        self.yf.ticker_cls = InfoTicker
+        self.cache.set("historical:TCS.NS:1y", HISTORY, category="historical")
+
+        fundamentals = self.fetcher.get_fundamentals("TCS.NS")
+
+        self.assertEqual(fundamentals["name"], "Tata Consultancy Services")
+        self.assertEqual(fundamentals["pe_ratio"], 30.0)
+        self.assertEqual(fundamentals["52_week_high"], 107.0)
+        self.assertEqual(fundamentals["52_week_low"], 95.0)
+        self.assertEqual(fundamentals["50_day_avg"], 102.0)
+        self.assertEqual(fundamentals["200_day_avg"], 102.0)
+
+    def test_info_ranges_without_history(self):
+        self.yf.ticker_cls = InfoTicker
+
+        fundamentals = self.fetcher.get_fundamentals("TCS.NS")
+
+        self.assertEqual(fundamentals["52_week_high"], 500.0)
+        self.assertEqual(fundamentals["50_day_avg"], 300.0)
+
+
+class ArrivalFuture(Future):
+    """Future that reports each caller about to block on its result"""
+    arrivals = None
+
+    def result(self, timeout=None):
+        self.arrivals.release()
+        return super().result(timeout)
+
+
+class SingleflightTest(FetcherTestCase):
+    FOLLOWERS = 4
+
+    def setUp(self):
+        super().setUp()
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.arrivals = threading.Semaphore(0)
+        for patcher in (
+            mock.patch.object(ArrivalFuture, "arrivals", self.arrivals),
+            mock.patch.object(fundamentals_fetcher, "Future", ArrivalFuture),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def blocking_fetch(self, result=None, error=None):
+        def fetch():
+            self.calls += 1
+            self.started.set()
+            self.release.wait(timeout=5)
+            if error is not None:
+                raise error
+            return result
+        return fetch
+
+    def run_concurrently(self, fetch):
+        """Leader runs fetch; followers join while it is blocked, then it is released"""
+        outcomes = []
+
+        def call():
+            try:
+                outcomes.append(self.fetcher._singleflight("fundamentals:TCS.NS", fetch))
+            except Exception as e:
+                outcomes.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        self.assertTrue(self.started.wait(timeout=5))
+        followers = [threading.Thread(target=call) for _ in range(self.FOLLOWERS)]
+        for thread in followers:
+            thread.start()
+        for _ in followers:
+            self.assertTrue(self.arrivals.acquire(timeout=5))
+        self.release.set()
+        for thread in [leader] + followers:
+            thread.join(timeout=5)
+        return outcomes
+
+    def test_concurrent_callers_share_one_fetch(self):
+        value = {"symbol": "TCS.NS"}
+        outcomes = self.run_concurrently(self.blocking_fetch(result=value))
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(outcomes), self.FOLLOWERS + 1)
+        for outcome in outcomes:
+            self.assertIs(outcome, value)
+        self.assertEqual(self.fetcher._inflight, {})
+
+    def test_exception_reaches_every_caller(self):
+        error = RuntimeError("yfinance down")
+        outcomes = self.run_concurrently(self.blocking_fetch(error=error))
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(outcomes), self.FOLLOWERS + 1)
+        for outcome in outcomes:
+            self.assertIs(outcome, error)
+        self.assertEqual(self.fetcher._inflight, {})
+
+        # A failed flight is not remembered: the next caller fetches again
+        self.assertEqual(self.fetcher._singleflight("fundamentals:TCS.NS", lambda: "retried"), "retried")
+
+    def test_sequential_calls_fetch_again(self):
+        self.release.set()
+        for expected in (1, 2):
+            self.fetcher._singleflight("fundamentals:TCS.NS", self.blocking_fetch())
+            self.assertEqual(self.calls, expected)
+
+    def test_different_keys_do_not_wait(self):
+        leader = threading.Thread(
+            target=self.fetcher._singleflight, args=("fundamentals:TCS.NS", self.blocking_fetch())
+        )
+        leader.start()
+        self.assertTrue(self.started.wait(timeout=5))
+        try:
+            self.assertEqual(self.fetcher._singleflight("fundamentals:INFY.NS", lambda: "other"), "other")
+        finally:
+            self.release.set()
+            leader.join(timeout=5)
+
+
+class ThreadSessionTest(unittest.TestCase):
+    def test_one_session_per_thread(self):
+        main_session = fundamentals_fetcher._thread_session()
+        other = []
+        worker = threading.Thread(target=lambda: other.append(fundamentals_fetcher._thread_session()))
+        worker.start()
+        worker.join()
+
+        self.assertIs(fundamentals_fetcher._thread_session(), main_session)
+        self.assertIsNot(other[0], main_session)
+
+
+if __name__ == "__main__":
+    unittest.main()
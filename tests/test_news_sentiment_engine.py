@@ -0,0 +1,109 @@
+"""
+Tests for news processing and sentiment scoring (no network access)
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.services import news_sentiment_engine
+from backend.services.data_cache_manager import DataCacheManager
+from backend.services.news_sentiment_engine import NewsSentimentEngine
+
+HEADLINES = (
+    "shares surge after record quarterly profit",
+    "stock slumps as regulator opens probe into accounts",
+    "board meets to consider dividend",
+    "analysts upgrade outlook on strong order book",
+    "plant shutdown hurts output, losses widen",
+)
+
+
+def make_articles(company: str, n: int):
+    return [
+        {
+            "title": f"{company} {HEADLINES[i % len(HEADLINES)]}",
+            "description": f"Update {i} on {company}." if i % 3 else None,
+            "url": f"https://example.com/{company}/{i}",
+            "source": {"name": "Example"},
+            "publishedAt": f"2024-01-{i % 28 + 1:02d}",
+        }
+        for i in range(n)
+    ] + [{"title": ""}]
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, articles):
+        self._articles = articles
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"articles": self._articles}
+
+
+class FakeAsyncClient:
+    """httpx.AsyncClient stand-in serving canned articles per company query"""
+    is_closed = False
+
+    def __init__(self, articles_by_company):
+        self.articles_by_company = articles_by_company
+
+    async def get(self, url, params=None, headers=None):
+        company = params["q"].split('"')[1]
+        return FakeResponse(self.articles_by_company[company])
+
+    async def aclose(self):
+        self.is_closed = True
+
+
+class NewsEngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = DataCacheManager(db_path=os.path.join(self._tmp.name, "cache.db"), gc_interval=0)
+        with mock.patch.object(news_sentiment_engine, "get_cache", return_value=self.cache):
+            self.engine = NewsSentimentEngine("test-key")
+
+    def tearDown(self):
+        self.cache._conn.close()
+        self._tmp.cleanup()
+
+
+class CompanyNewsManyTest(NewsEngineTestCase):
+    def test_batch_matches_per_company_processing(self):
+        companies = {name: make_articles(name, 25) for name in ("Infosys", "Wipro", "Titan")}
+        self.engine._async_client = FakeAsyncClient(companies)
+        pairs = [(name, f"{name.upper()}.NS") for name in companies]
+
+        results = asyncio.run(self.engine.get_company_news_many(pairs, limit=30))
+
+        for name, symbol in pairs:
+            self.assertEqual(results[symbol], self.engine._process_articles(companies[name]))
+            self.assertEqual(self.cache.get(f"news:company:{symbol}"), results[symbol])
+
+
+class ScoreAsyncTest(NewsEngineTestCase):
+    def test_parallel_scores_match_in_process(self):
+        texts = [f"{HEADLINES[i % len(HEADLINES)]} ({i})" for i in range(news_sentiment_engine.PARALLEL_SCORING_MIN + 8)]
+        expected = [self.engine._polarity_scores(text) for text in texts]
+
+        # Force the pool even on a single-core machine
+        with mock.patch.object(news_sentiment_engine, "CPU_WORKERS", 2):
+            self.assertEqual(asyncio.run(self.engine.score_async(texts)), expected)
+
+    def test_small_batches_score_in_process(self):
+        texts = list(HEADLINES)
+        with mock.patch.object(news_sentiment_engine, "get_cpu_pool") as get_pool:
+            scores = asyncio.run(self.engine.score_async(texts))
+
+        get_pool.assert_not_called()
+        self.assertEqual(scores, [self.engine._polarity_scores(text) for text in texts])
+
+
+if __name__ == "__main__":
+    unittest.main()
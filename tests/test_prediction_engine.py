@@ -0,0 +1,111 @@
+"""
+Tests for the prediction engine's fingerprint-keyed model cache (training is stubbed)
+"""
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from backend.services import prediction_engine
+from backend.services.prediction_engine import PredictionEngine
+
+
+def make_features(seed: int, rows: int = 40) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(100.0, 5.0, (rows, 3)), columns=["close", "rsi", "sma_20"])
+
+
+class ModelCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = self.new_engine()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def new_engine(self) -> PredictionEngine:
+        engine = PredictionEngine(model_path=self._tmp.name)
+        engine.trained = []
+
+        def train_model(features_df, target_col='close'):
+            # Stand-in for the ensemble fit: records the call and leaves a picklable model
+            engine.trained.append(engine._fingerprint(features_df))
+            engine.model = {'scaler': StandardScaler(), 'kind': 'stub'}
+            return {'mape': float(len(engine.trained)), 'r2_score': 0.9}
+
+        engine.train_model = train_model
+        return engine
+
+    def test_identical_features_reuse_model(self):
+        first = self.engine._get_or_train(make_features(1))
+        second = self.engine._get_or_train(make_features(1))
+
+        self.assertEqual(len(self.engine.trained), 1)
+        self.assertEqual(first, second)
+        self.assertIs(self.engine.scaler, self.engine.model['scaler'])
+
+    def test_changed_features_train_again(self):
+        features = make_features(1)
+        self.engine._get_or_train(features)
+
+        changed = features.copy()
+        changed.iloc[-1, 0] += 0.01
+        renamed = features.rename(columns={"rsi": "rsi_14"})
+        self.engine._get_or_train(changed)
+        self.engine._get_or_train(renamed)
+
+        self.assertEqual(len(self.engine.trained), 3)
+        self.assertEqual(len(set(self.engine.trained)), 3)
+
+    def test_persisted_model_survives_restart(self):
+        metrics = self.engine._get_or_train(make_features(1))
+
+        restarted = self.new_engine()
+        self.assertEqual(restarted._get_or_train(make_features(1)), metrics)
+        self.assertEqual(restarted.trained, [])
+        self.assertEqual(restarted.model['kind'], 'stub')
+
+    def test_stale_persisted_model_is_retrained(self):
+        features = make_features(1)
+        self.engine._get_or_train(features)
+        path = self.engine._model_file(self.engine._fingerprint(features))
+        stale = time.time() - prediction_engine.MODEL_TTL - 60
+        os.utime(path, (stale, stale))
+
+        restarted = self.new_engine()
+        restarted._get_or_train(features)
+        self.assertEqual(len(restarted.trained), 1)
+
+    def test_memory_cache_evicts_least_recently_used(self):
+        fps = [self.engine._fingerprint(make_features(seed)) for seed in range(3)]
+        with mock.patch.object(prediction_engine, "MODEL_MEMORY_SIZE", 2), \
+             mock.patch.object(self.engine, "_load_model", return_value=None):
+            self.engine._get_or_train(make_features(0))
+            self.engine._get_or_train(make_features(1))
+            # Touch 0 so that 1 is the least recently used when 2 arrives
+            self.engine._get_or_train(make_features(0))
+            self.engine._get_or_train(make_features(2))
+
+            self.assertEqual(list(self.engine._models), [fps[0], fps[2]])
+            self.assertEqual(len(self.engine.trained), 3)
+
+            # The evicted model is trained again (disk reuse is disabled here)
+            self.engine._get_or_train(make_features(1))
+            self.assertEqual(self.engine.trained[-1], fps[1])
+            self.assertEqual(list(self.engine._models), [fps[2], fps[1]])
+
+    def test_failed_training_is_not_cached(self):
+        self.engine.train_model = lambda features_df, target_col='close': {}
+
+        self.assertEqual(self.engine._get_or_train(make_features(1)), {})
+        self.assertEqual(len(self.engine._models), 0)
+        self.assertEqual(os.listdir(self._tmp.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
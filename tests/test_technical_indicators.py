@@ -0,0 +1,246 @@
+"""
+Parity tests for the indicator kernels against the original pandas rolling/ewm code
+"""
+import unittest
+from collections.abc import Mapping
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from backend.services import technical_indicators
+from backend.services.technical_indicators import HAS_NUMBA, OUTPUT_DTYPE, TechnicalIndicators
+
+
+# Reference implementations: the pandas code the kernels replaced, with the same
+# length guards (all-NaN instead of a list of None for a too-short series)
+
+def ref_sma(close, period):
+    if len(close) < period:
+        return np.full(len(close), np.nan)
+    return pd.Series(close).rolling(window=period).mean().to_numpy()
+
+
+def ref_rsi(close, period=14):
+    if len(close) < period + 1:
+        return np.full(len(close), np.nan)
+    delta = pd.Series(close).diff()
+    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (100 - (100 / (1 + gain / loss))).to_numpy()
+
+
+def ref_bollinger(close, period=20, std_dev=2):
+    if len(close) < period:
+        nan = np.full(len(close), np.nan)
+        return {"upper": nan, "middle": nan, "lower": nan}
+    prices = pd.Series(close)
+    middle = prices.rolling(window=period).mean()
+    std = prices.rolling(window=period).std()
+    # pandas 2.1 (requirements.txt) returns exactly 0 for a flat window; pandas 3 leaves
+    # summation residue there, so pin the reference to the 2.1 result
+    flat = prices.diff().ne(0).cumsum().rolling(window=period).apply(lambda ids: ids[0] == ids[-1], raw=True)
+    std[flat == 1] = 0.0
+    return {
+        "upper": (middle + std * std_dev).to_numpy(),
+        "middle": middle.to_numpy(),
+        "lower": (middle - std * std_dev).to_numpy(),
+    }
+
+
+def ref_atr(high, low, close, period=14):
+    if len(high) < period + 1:
+        return np.full(len(high), np.nan)
+    df = pd.DataFrame({"high": high, "low": low, "close": close})
+    df["h-l"] = df["high"] - df["low"]
+    df["h-pc"] = abs(df["high"] - df["close"].shift(1))
+    df["l-pc"] = abs(df["low"] - df["close"].shift(1))
+    return df[["h-l", "h-pc", "l-pc"]].max(axis=1).rolling(window=period).mean().to_numpy()
+
+
+def ref_stochastic(high, low, close, period=14):
+    if len(high) < period:
+        nan = np.full(len(high), np.nan)
+        return {"k": nan, "d": nan}
+    low_min = pd.Series(low).rolling(window=period).min()
+    high_max = pd.Series(high).rolling(window=period).max()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 * ((pd.Series(close) - low_min) / (high_max - low_min))
+    # Flat windows are documented to give NaN rather than +/-inf
+    k[np.isinf(k)] = np.nan
+    return {"k": k.to_numpy(), "d": k.rolling(window=3).mean().to_numpy()}
+
+
+def ref_rolling(high, low, close):
+    return {
+        "sma_20": ref_sma(close, 20),
+        "sma_50": ref_sma(close, 50),
+        "sma_200": ref_sma(close, 200),
+        "rsi": ref_rsi(close),
+        "bollinger": ref_bollinger(close),
+        "atr": ref_atr(high, low, close),
+        "stochastic": ref_stochastic(high, low, close),
+    }
+
+
+def make_series(n, seed=7, nan_at=(), flat=None):
+    """
+    Random-walk high/low/close
+
+    Args:
+        n: Number of bars
+        seed: RNG seed
+        nan_at: Bar indices blanked (NaN) in every column
+        flat: Optional (start, stop) range of bars held at one price with high == low
+    """
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, n)))
+    spread = close * rng.uniform(0.0, 0.02, n)
+    high = close + spread
+    low = close - spread
+    if flat is not None:
+        start, stop = flat
+        close[start:stop] = high[start:stop] = low[start:stop] = close[start]
+    for i in nan_at:
+        close[i] = high[i] = low[i] = np.nan
+    return high, low, close
+
+
+# Lengths below, between and above the indicator windows, with and without gaps
+CASES = {
+    "short": make_series(10),
+    "rsi_window": make_series(14),
+    "between_windows": make_series(60),
+    "long": make_series(300),
+    "nan_gaps": make_series(300, seed=11, nan_at=(5, 90, 91, 230)),
+    "flat_window": make_series(300, seed=13, flat=(100, 140)),
+    "flat_and_gaps": make_series(260, seed=17, nan_at=(30, 180), flat=(60, 95)),
+}
+
+
+def flatten(indicators, prefix=""):
+    out = {}
+    for key, value in indicators.items():
+        if isinstance(value, Mapping):
+            out.update(flatten(value, f"{prefix}{key}."))
+        else:
+            out[f"{prefix}{key}"] = np.asarray(value, dtype=np.float64)
+    return out
+
+
+class IndicatorParityTestCase(unittest.TestCase):
+    def assertSeriesMatch(self, actual, expected, rtol, atol, case):
+        actual, expected = flatten(actual), flatten(expected)
+        self.assertEqual(sorted(actual), sorted(expected))
+        for name in expected:
+            with self.subTest(case=case, series=name):
+                # Also checks that NaN (warm-up, gaps, flat windows) sits at the same bars
+                np.testing.assert_allclose(actual[name], expected[name], rtol=rtol, atol=atol)
+
+
+class NumPyFallbackTest(IndicatorParityTestCase):
+    def test_rolling_indicators_match_pandas(self):
+        for case, (high, low, close) in CASES.items():
+            with mock.patch.object(technical_indicators, "HAS_NUMBA", False):
+                actual = {
+                    "sma_20": TechnicalIndicators.calculate_sma(close, 20),
+                    "sma_50": TechnicalIndicators.calculate_sma(close, 50),
+                    "sma_200": TechnicalIndicators.calculate_sma(close, 200),
+                    "rsi": TechnicalIndicators.calculate_rsi(close),
+                    "bollinger": TechnicalIndicators.calculate_bollinger_bands(close),
+                    "atr": TechnicalIndicators.calculate_atr(high, low, close),
+                    "stochastic": TechnicalIndicators.calculate_stochastic(high, low, close),
+                }
+            self.assertSeriesMatch(actual, ref_rolling(high, low, close), rtol=1e-9, atol=1e-9, case=case)
+
+    def test_ema_and_macd_match_pandas(self):
+        for case, (_, _, close) in CASES.items():
+            if case in ("nan_gaps", "flat_and_gaps"):
+                continue
+            with mock.patch.object(technical_indicators, "_ewm", technical_indicators._ewm_pandas):
+                actual = TechnicalIndicators.calculate_macd(close)
+            ema_fast = pd.Series(close).ewm(span=12, adjust=False).mean()
+            ema_slow = pd.Series(close).ewm(span=26, adjust=False).mean()
+            macd = ema_fast - ema_slow
+            signal = macd.ewm(span=9, adjust=False).mean()
+            expected = {"macd": macd, "signal": signal, "histogram": macd - signal}
+            if len(close) < 26:
+                expected = {key: np.full(len(close), np.nan) for key in expected}
+            self.assertSeriesMatch(actual, expected, rtol=1e-12, atol=1e-12, case=case)
+
+
+@unittest.skipUnless(HAS_NUMBA, "numba is not installed")
+class FusedKernelTest(IndicatorParityTestCase):
+    def test_compute_all_matches_pandas(self):
+        for case, (high, low, close) in CASES.items():
+            actual = TechnicalIndicators._calculate_rolling_fused(high, low, close)
+            expected = ref_rolling(high, low, close)
+            # The kernel stores OUTPUT_DTYPE, so compare at float32 precision
+            self.assertSeriesMatch(actual, expected, rtol=2e-6, atol=1e-4, case=case)
+
+    def test_compute_all_matches_numpy_fallback(self):
+        for case, (high, low, close) in CASES.items():
+            fused = TechnicalIndicators._calculate_all_arr(high, low, close)
+            with mock.patch.object(technical_indicators, "HAS_NUMBA", False), \
+                 mock.patch.object(technical_indicators, "_ewm", technical_indicators._ewm_pandas):
+                fallback = TechnicalIndicators._calculate_all_arr(high, low, close)
+            self.assertEqual(fused["latest"], fallback["latest"], case)
+            fused = {key: value for key, value in fused.items() if key != "latest"}
+            fallback = {key: value for key, value in fallback.items() if key != "latest"}
+            self.assertSeriesMatch(fused, fallback, rtol=2e-6, atol=1e-4, case=case)
+
+    def test_output_block_dtype(self):
+        high, low, close = CASES["long"]
+        indicators = TechnicalIndicators._calculate_rolling_fused(high, low, close)
+        self.assertEqual(indicators["rsi"].dtype, OUTPUT_DTYPE)
+        self.assertEqual(indicators["stochastic"]["d"].dtype, OUTPUT_DTYPE)
+
+
+@unittest.skipUnless(HAS_NUMBA, "numba is not installed")
+class EwmKernelTest(unittest.TestCase):
+    def test_matches_pandas_without_gaps(self):
+        for case, (_, _, close) in CASES.items():
+            if case in ("nan_gaps", "flat_and_gaps"):
+                continue
+            for alpha in (2 / 13, 2 / 27, 0.2):
+                with self.subTest(case=case, alpha=alpha):
+                    np.testing.assert_allclose(
+                        technical_indicators._ewm(close, alpha),
+                        pd.Series(close).ewm(alpha=alpha, adjust=False).mean().to_numpy(),
+                        rtol=1e-12,
+                    )
+
+    def test_nan_gaps_follow_pinned_pandas(self):
+        # Expected values from pandas 2.1 (requirements.txt); pandas 3 reweights
+        # the bar after a gap, so these are not recomputed with the installed pandas
+        values = np.array([10.0, np.nan, np.nan, 13.0, 12.0, np.nan, 15.0])
+        np.testing.assert_allclose(
+            technical_indicators._ewm(values, 0.5),
+            [10.0, 10.0, 10.0, 12.4, 12.2, 12.2, 14.066666666666668],
+            rtol=1e-12,
+        )
+
+    def test_leading_nans(self):
+        values = np.array([np.nan, np.nan, 4.0, 6.0])
+        np.testing.assert_allclose(technical_indicators._ewm(values, 0.5), [np.nan, np.nan, 4.0, 5.0])
+
+    def test_empty(self):
+        self.assertEqual(technical_indicators._ewm(np.empty(0), 0.5).size, 0)
+
+
+@unittest.skipUnless(HAS_NUMBA, "numba is not installed")
+class RollingMinMaxKernelTest(unittest.TestCase):
+    def test_matches_pandas(self):
+        for case, (high, low, _) in CASES.items():
+            for period in (1, 3, 14, 50):
+                out_min = np.empty(low.size)
+                out_max = np.empty(high.size)
+                technical_indicators._rolling_min_max(low, high, period, out_min, out_max)
+                with self.subTest(case=case, period=period):
+                    np.testing.assert_array_equal(out_min, pd.Series(low).rolling(period).min().to_numpy())
+                    np.testing.assert_array_equal(out_max, pd.Series(high).rolling(period).max().to_numpy())
+
+
+if __name__ == "__main__":
+    unittest.main()